@@ -0,0 +1,116 @@
+"""Validate many docx files in a process pool.
+
+Usage: python batch.py in/ -r example_req.json -o results.jsonl -j 8
+
+Every document produces one JSON line with errors, log, warnings and
+timing, written as soon as the document is validated.
+"""
+
+__all__ = ['iter_documents', 'validate_batch']
+
+import argparse
+import glob
+import json
+import os
+import time
+from multiprocessing import Pool
+
+_plan = None
+_wrapper_class = None
+_aggregate = False
+_profile = False
+
+
+def iter_documents(paths):
+    """Expand directories and glob patterns to .docx file paths."""
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(glob.glob(os.path.join(path, '**', '*.docx'), recursive=True))
+        else:
+            names = sorted(glob.glob(path, recursive=True))
+        for name in names:
+            # skip Word lock files like ~$name.docx
+            if not os.path.basename(name).startswith('~$'):
+                yield name
+
+
+def _init_worker(requirements, streaming, aggregate, profile):
+    # heavy modules and the compiled plan are loaded once per worker
+    global _plan, _wrapper_class, _aggregate, _profile
+    from validator import RequirementsPlan
+    if streaming:
+        from streaming import StreamingDocumentWrapper as wrapper_class
+    else:
+        from wrapper import DocumentWrapper as wrapper_class
+    _plan = RequirementsPlan(requirements)
+    _wrapper_class = wrapper_class
+    _aggregate = aggregate
+    _profile = profile
+
+
+def _validate_document(path):
+    start = time.perf_counter()
+    record = {"file": path}
+    try:
+        validator = _plan.validator(_wrapper_class(path), make_changes=False, profile=_profile)
+        validator.validate()
+        errors, log, warnings, _ = validator.result(_aggregate)
+        record.update({"errors": errors, "log": log, "warnings": warnings,
+                       "errors_num": validator.errors_num})
+        if _profile:
+            record["profile"] = validator.profile
+    except Exception as err:
+        record["exception"] = f"{type(err).__name__}: {err}"
+    record["time"] = time.perf_counter() - start
+    return json.dumps(record, ensure_ascii=False, default=str)
+
+
+def validate_batch(paths, requirements, output, processes=None, streaming=False, aggregate=False,
+                   profile=False):
+    """Validate documents and write one JSON line per document to output.
+
+    :param paths: docx paths, directories or glob patterns
+    :param requirements: json
+    :param output: text file-like object for JSON lines
+    :param processes: pool size, None implies os.cpu_count()
+    :param streaming: use StreamingDocumentWrapper to keep memory flat
+    :param aggregate: merge repeated errors into location ranges
+    :param profile: add time, calls and items per check to every record
+    :return: number of validated documents
+    """
+
+    num = 0
+    with Pool(processes, initializer=_init_worker,
+              initargs=(requirements, streaming, aggregate, profile)) as pool:
+        for line in pool.imap_unordered(_validate_document, iter_documents(paths)):
+            output.write(line + "\n")
+            output.flush()
+            num += 1
+    return num
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate docx files against requirements.")
+    parser.add_argument("paths", nargs="+", help="docx files, directories or glob patterns")
+    parser.add_argument("-r", "--requirements", required=True, help="requirements json file")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSON lines output file")
+    parser.add_argument("-j", "--processes", type=int, default=None, help="worker processes")
+    parser.add_argument("--streaming", action="store_true",
+                        help="read documents with StreamingDocumentWrapper")
+    parser.add_argument("--aggregate", action="store_true",
+                        help="merge repeated errors into paragraph ranges")
+    parser.add_argument("--profile", action="store_true",
+                        help="record time, calls and items per check")
+    args = parser.parse_args()
+
+    with open(args.requirements, "r") as f:
+        requirements = json.load(f)
+    start = time.perf_counter()
+    with open(args.output, "w", encoding="utf-8") as output:
+        num = validate_batch(args.paths, requirements, output, args.processes, args.streaming,
+                             args.aggregate, args.profile)
+    print(f"Validated {num} documents in {time.perf_counter() - start:.1f} s, results in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
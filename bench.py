@@ -0,0 +1,323 @@
+"""Benchmarks on synthetic documents.
+
+Usage: python bench.py --scales 1000 10000 100000 -o bench.json --ontology
+       python bench.py --scales 1000 -o new.json --compare bench.json
+
+Documents of the requested sizes are generated once into the work
+directory and reused. Every benchmark reports the best wall time of
+several repeats, throughput in items per second and peak resident set
+size of a separate forked run, as one JSON document. RSS includes the
+memory of lxml, which Python allocation tracing doesn't see.
+"""
+
+__all__ = ['generate_document', 'generate_requirements', 'run_benchmarks', 'compare']
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from docx import Document
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.shared import Pt, Cm
+from PIL import Image
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+_WORDS = ['документ', 'проверка', 'требование', 'оформление', 'структура', 'онтология', 'абзац',
+          'шрифт', 'интервал', 'рисунок', 'таблица', 'результат', 'метод', 'анализ', 'система']
+_FONTS = ['Times New Roman', 'Times New Roman', 'Times New Roman', 'Arial', 'Calibri']
+_REQUIREMENTS_TEXT = [
+    "Статья должна быть набрана шрифтом Times New Roman размером 12 пт с межстрочным интервалом 1,5.",
+    "Выравнивание основного текста по ширине.",
+    "Объем статьи не менее 1000 и не более 10000 слов.",
+    "Количество рисунков не более 5, ширина рисунка не более 10 см.",
+    "Ключевые слова: от 4 до 6 слов на русском и английском языке.",
+    "Поля: верхнее и нижнее 2 см, левое 3 см, правое 1,5 см.",
+    "Курсив и подчеркивание не допускаются.",
+    "Список литературы должен содержать не менее 10 источников, оформленных по ГОСТ Р 7.0.5 2008.",
+]
+
+
+def _sentence(rnd, words):
+    return ' '.join(rnd.choice(_WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def generate_document(path, paragraphs, runs=3, images=0, image_size=(800, 600), tables=0, seed=0):
+    """Write a synthetic article with title, UDC, keywords, body, captions and tables.
+
+    :param path: docx path
+    :param paragraphs: number of body paragraphs
+    :param runs: runs per body paragraph, with different formatting
+    :param images: number of images with "Рисунок N" captions
+    :param image_size: image size in pixels
+    :param tables: number of 3x3 tables with "Таблица N" captions
+    :param seed: random seed, the same arguments give the same document
+    """
+
+    rnd = random.Random(seed)
+    document = Document()
+    title = document.add_paragraph("Синтетическая статья для измерения производительности")
+    title.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    document.add_paragraph("УДК 004.912")
+    document.add_paragraph("Ключевые слова: документ, проверка, онтология, требования, оформление")
+    document.add_paragraph("Keywords: document, validation, ontology, requirements, design")
+
+    image_data = None
+    if images:
+        buffer = io.BytesIO()
+        Image.new("RGB", image_size, (200, 30, 30)).save(buffer, "PNG", dpi=(96, 96))
+        image_data = buffer.getvalue()
+    # images and tables are spread evenly over the body
+    image_every = paragraphs // images if images else 0
+    table_every = paragraphs // tables if tables else 0
+    image_num = 0
+    table_num = 0
+    for i in range(paragraphs):
+        paragraph = document.add_paragraph()
+        for j in range(runs):
+            run = paragraph.add_run(_sentence(rnd, rnd.randint(5, 15)) + ' ')
+            run.font.name = rnd.choice(_FONTS)
+            run.font.size = Pt(rnd.choice((12, 12, 12, 14)))
+            run.bold = j % 4 == 1
+            run.italic = j % 5 == 2
+        if image_every and i % image_every == 0 and image_num < images:
+            image_num += 1
+            paragraph.add_run(f" Как показано на рис. {image_num}.")
+            document.add_picture(io.BytesIO(image_data), width=Cm(12))
+            document.add_paragraph(f"Рисунок {image_num} - Синтетическое изображение")
+        if table_every and i % table_every == 0 and table_num < tables:
+            table_num += 1
+            paragraph.add_run(f" Данные приведены в таблице {table_num}.")
+            document.add_paragraph(f"Таблица {table_num} - Синтетические данные")
+            table = document.add_table(rows=3, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = str(rnd.randint(0, 1000))
+    document.add_paragraph("Список литературы")
+    for i in range(15):
+        document.add_paragraph(f"{i + 1}. Иванов И.И. Книга {i + 1}. М.: Наука, {2000 + i}. 100 с.")
+    document.save(path)
+
+
+def generate_requirements(path, sentences=50, seed=0):
+    """Write a requirements docx of sentences in natural language."""
+
+    rnd = random.Random(seed)
+    document = Document()
+    for i in range(sentences):
+        document.add_paragraph(_REQUIREMENTS_TEXT[i % len(_REQUIREMENTS_TEXT)] + ' ' + _sentence(rnd, 8))
+    document.save(path)
+
+
+def _bench_requirements():
+    with open(os.path.join(_ROOT, 'example_req.json'), 'r') as f:
+        requirements = json.load(f)
+    # enable all implemented checks
+    requirements['general']['italic_allowed'] = False
+    requirements['general']['bold_allowed'] = False
+    requirements['general']['double_space_allowed'] = False
+    requirements['images']['links_required'] = True
+    requirements['UDC']['required'] = True
+    return requirements
+
+
+def _peak_rss(func, setup=None):
+    """Run setup and func in a forked process, return its peak RSS in bytes.
+
+    The peak of a forked process starts from the pages it touches, not
+    from the peak of the parent. None where fork is not available.
+    """
+    if not hasattr(os, 'fork'):
+        return None
+    import resource
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            args = () if setup is None else (setup(),)
+            func(*args)
+            os.write(write_fd, str(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss).encode())
+            status = 0
+        finally:
+            os._exit(status)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        peak = f.read()
+    os.waitpid(pid, 0)
+    if not peak:
+        return None
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return int(peak) * (1 if sys.platform == 'darwin' else 1024)
+
+
+def _measure(func, repeat, memory, setup=None):
+    """Run func repeat times, return the best time and peak memory.
+
+    :param setup: untimed callable, its result is passed to func
+    """
+    best = None
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        gc.collect()
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    peak = _peak_rss(func, setup) if memory else None
+    return best, peak
+
+
+def _load(wrapper_class, path):
+    """Open a document and read all its paragraphs, streaming wrappers
+    read them lazily."""
+    wrapper = wrapper_class(path)
+    for _ in wrapper.iter_paragraphs():
+        pass
+    return wrapper
+
+
+def _cases(scales, workdir):
+    for paragraphs in scales:
+        path = os.path.join(workdir, f"doc_{paragraphs}.docx")
+        if not os.path.exists(path):
+            generate_document(path, paragraphs, runs=3, images=max(1, paragraphs // 500),
+                              tables=max(1, paragraphs // 1000))
+        yield str(paragraphs), path, paragraphs
+
+
+def run_benchmarks(scales, workdir, repeat=3, memory=True, ontology=None):
+    """Time loading, validation phases, result, saving and requirements parsing.
+
+    :param scales: numbers of body paragraphs of generated documents
+    :param workdir: directory for generated documents and outputs
+    :param repeat: runs per benchmark, the best time is reported
+    :param memory: measure peak RSS in an extra forked run
+    :param ontology: owl file for RequirementsReader, None skips it
+    :return: list of {"case", "benchmark", "time", "items", "throughput", "peak_memory"}
+    """
+
+    from validator import RequirementsPlan
+    from wrapper import DocumentWrapper
+    from streaming import StreamingDocumentWrapper
+
+    os.makedirs(workdir, exist_ok=True)
+    plan = RequirementsPlan(_bench_requirements())
+    results = []
+
+    def add(case, name, func, items, setup=None):
+        seconds, peak = _measure(func, repeat, memory, setup)
+        results.append({"case": case,
+                        "benchmark": name,
+                        "time": seconds,
+                        "items": items,
+                        "throughput": items / seconds if seconds else None,
+                        "peak_memory": peak
+                        })
+        print(f"{case:>8} {name:<40} {seconds:9.4f} s")
+
+    for case, path, items in _cases(scales, workdir):
+        add(case, "DocumentWrapper", lambda: _load(DocumentWrapper, path), items)
+        add(case, "StreamingDocumentWrapper", lambda: _load(StreamingDocumentWrapper, path), items)
+        # every phase runs on a freshly loaded document, loading is not timed
+        for phase in plan.phases:
+            add(case, phase, lambda wrapper, phase=phase: getattr(plan.validator(wrapper, make_changes=False), phase)(),
+                items, lambda: DocumentWrapper(path))
+        validator = plan.validator(DocumentWrapper(path), make_changes=False)
+        validator.validate()
+        add(case, "validate", lambda wrapper: plan.validator(wrapper, make_changes=False).validate(),
+            items, lambda: DocumentWrapper(path))
+        add(case, "result", validator.result, items)
+        add(case, "result(aggregate)", lambda: validator.result(True), items)
+        wrapper = DocumentWrapper(path)
+        wrapper.grayscale_images()
+        output = os.path.join(workdir, "saved.docx")
+        add(case, "save_as", lambda: wrapper.save_as(output), items)
+
+    if ontology is not None:
+        from parser import RequirementsReader
+        os.makedirs(os.path.join(workdir, "in"), exist_ok=True)
+        generate_requirements(os.path.join(workdir, "in", "requirements.docx"))
+        cwd = os.getcwd()
+        # RequirementsReader reads files from in/ of the working directory
+        os.chdir(workdir)
+        try:
+            reader = RequirementsReader("requirements.docx", ontology)
+            sentences = len(reader.sentences)
+
+            def parse():
+                reader.requirements_decoration[:] = []
+                reader.requirements_structure[:] = []
+                reader.requirements_content[:] = []
+                reader.requirements_quantitative[:] = []
+                reader.parse_requirements()
+            add("requirements", "RequirementsReader", lambda: RequirementsReader("requirements.docx", ontology),
+                sentences)
+            add("requirements", "RequirementsReader(cache)",
+                lambda: RequirementsReader("requirements.docx", ontology, "ontology_cache"), sentences)
+            add("requirements", "parse_requirements", parse, sentences)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=_ROOT, capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(old, new):
+    """Get [(case, benchmark, old time, new time, new / old)] for benchmarks in both reports."""
+    old_times = {(r["case"], r["benchmark"]): r["time"] for r in old["results"]}
+    rows = []
+    for r in new["results"]:
+        key = (r["case"], r["benchmark"])
+        if key in old_times:
+            rows.append((r["case"], r["benchmark"], old_times[key], r["time"],
+                         r["time"] / old_times[key] if old_times[key] else None))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document loading, validation and saving.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000],
+                        help="body paragraphs of generated documents, e.g. 1000 10000 100000")
+    parser.add_argument("-w", "--workdir", default="bench_data", help="directory for generated documents")
+    parser.add_argument("-o", "--output", default="bench.json", help="JSON report")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument("--no-memory", action="store_true", help="skip peak memory measurement")
+    parser.add_argument("--ontology", nargs="?", const=os.path.join(_ROOT, "document.owl"),
+                        help="benchmark RequirementsReader with this ontology, document.owl if no file is given")
+    parser.add_argument("--compare", help="earlier JSON report to compare with")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales, os.path.abspath(args.workdir), args.repeat, not args.no_memory,
+                             os.path.abspath(args.ontology) if args.ontology else None)
+    report = {"commit": _commit(),
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "repeat": args.repeat,
+              "results": results}
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results in {args.output}")
+    if args.compare:
+        with open(args.compare, "r") as f:
+            old = json.load(f)
+        for case, name, old_time, new_time, ratio in compare(old, report):
+            print(f"{case:>8} {name:<40} {old_time:9.4f} s -> {new_time:9.4f} s  x{ratio:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+__all__ = ['CaptionIndex']
+
+import re
+
+
+class CaptionIndex(object):
+    """Where numbered captions are defined and referenced in a document.
+
+    Paragraphs are added one by one in document order and each is scanned
+    with two compiled patterns, so link checks become dict lookups instead
+    of rescanning the document for every caption.
+    """
+
+    def __init__(self, definition, reference, marker):
+        """
+        :param definition: pattern of a caption, group 1 is the number
+        :param reference: pattern of a reference in lowercase text,
+                          group 1 is the number
+        :param marker: lowercase substring every reference contains, used
+                       to skip paragraphs without regex matching
+        """
+        self._definition = re.compile(definition)
+        self._reference = re.compile(reference)
+        self._marker = marker
+        self.definitions = {}
+        self.references = {}
+
+    @classmethod
+    def figures(cls):
+        return cls(r'Рисунок\s*(\d+)(?!\d)',
+                   r'(?<![а-яё])рис(?:\.|унок|унке|унка|унку|унком)?\s*(\d+)(?!\d)',
+                   'рис')
+
+    @classmethod
+    def tables(cls):
+        return cls(r'Таблица\s*(\d+)(?!\d)',
+                   r'(?<![а-яё])табл(?:\.|ица|ице|ицы|ицу|ицей)?\s*(\d+)(?!\d)',
+                   'табл')
+
+    def add(self, paragraph_index, text, lower=None):
+        """Index captions and references of one paragraph.
+
+        :param paragraph_index: paragraph number, must grow with every call
+        :param text: paragraph text
+        :param lower: text.lower() if it is already computed
+        """
+        if lower is None:
+            lower = text.lower()
+        if self._marker not in lower:
+            return
+        for number in {int(m.group(1)) for m in self._definition.finditer(text)}:
+            self.definitions.setdefault(number, []).append(paragraph_index)
+        for number in {int(m.group(1)) for m in self._reference.finditer(lower)}:
+            self.references.setdefault(number, []).append(paragraph_index)
+
+    def first_reference(self, number, exclude=None):
+        """Get the first paragraph referencing number other than exclude."""
+        paragraphs = self.references.get(number, [])
+        if len(paragraphs) > 0 and paragraphs[0] != exclude:
+            return paragraphs[0]
+        if len(paragraphs) > 1:
+            return paragraphs[1]
+        return None
+
+    def links(self):
+        """Yield (number, definition paragraph, first other reference or None)
+        for every caption in number order."""
+        for number in sorted(self.definitions):
+            for paragraph_index in self.definitions[number]:
+                yield number, paragraph_index, self.first_reference(number, paragraph_index)
@@ -0,0 +1,187 @@
+__all__ = ['ErrorFormat', 'ErrorRecord', 'ErrorStore']
+
+
+class ErrorFormat(object):
+    """How errors of one check are placed in JSON and rendered as text."""
+
+    __slots__ = ('path', 'message', 'json', 'aggregate')
+
+    def __init__(self, path, message, json, aggregate=None):
+        """
+        :param path: keys of the errors list in JSON, e.g. ('general', 'font')
+        :param message: format string with {location}, {run}, {expected}
+                        and {found} fields
+        :param json: JSON keys for (location, run, expected, found), None
+                     skips a field, a tuple of keys spreads a tuple value.
+                     A format string like message makes a string entry
+        :param aggregate: message for records aggregated over locations,
+                          without {run}. Records of a message with {run}
+                          and no aggregate message are never aggregated
+        """
+        self.path = path
+        self.message = message
+        self.json = json
+        self.aggregate = aggregate
+
+    @property
+    def aggregatable(self):
+        return self.aggregate is not None or '{run' not in self.message
+
+    @staticmethod
+    def _format(template, record, location):
+        return template.format(location=record.location if location is None else location,
+                               run=record.run,
+                               expected=record.expected,
+                               found=record.found)
+
+    def render(self, record, location=None):
+        return self._format(self.message, record, location)
+
+    def render_aggregated(self, record, location):
+        return self._format(self.aggregate or self.message, record, location)
+
+    def to_json(self, record, location=None, count=None):
+        if isinstance(self.json, str):
+            return self._format(self.json, record, location)
+        entry = {}
+        values = (record.location if location is None else location,
+                  record.run, record.expected, record.found)
+        for key, value in zip(self.json, values):
+            if key is None or (count is not None and key == self.json[1]):
+                # run numbers differ inside an aggregated entry
+                continue
+            if isinstance(key, tuple):
+                entry.update(zip(key, value))
+            else:
+                entry[key] = value
+        if count is not None:
+            entry["count"] = count
+        return entry
+
+
+class ErrorRecord(object):
+    """Single violation, the message is rendered only when requested."""
+
+    __slots__ = ('check', 'location', 'run', 'expected', 'found')
+
+    def __init__(self, check, location=None, run=None, expected=None, found=None):
+        self.check = check
+        self.location = location
+        self.run = run
+        self.expected = expected
+        self.found = found
+
+
+def _ranges(numbers):
+    """Collapse sorted unique numbers to [[first, last], ...]."""
+    ranges = []
+    for n in numbers:
+        if ranges and ranges[-1][1] + 1 == n:
+            ranges[-1][1] = n
+        else:
+            ranges.append([n, n])
+    return ranges
+
+
+def _ranges_text(ranges):
+    return ", ".join(str(first) if first == last else f"{first}–{last}"
+                     for first, last in ranges)
+
+
+class ErrorStore(object):
+    """Compact store of ErrorRecords with lazy messages and JSON.
+
+    Errors with the same check, expected and found values can be
+    aggregated into location ranges, e.g. font size 14 found in
+    paragraphs 3–250.
+    """
+
+    def __init__(self, formats, skeleton):
+        """
+        :param formats: {check id: ErrorFormat}
+        :param skeleton: empty JSON structure errors are placed into
+        """
+        self._formats = formats
+        self._skeleton = skeleton
+        self._records = []
+
+    def add(self, check, location=None, run=None, expected=None, found=None):
+        self._records.append(ErrorRecord(check, location, run, expected, found))
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def count(self, check):
+        return sum(1 for record in self._records if record.check == check)
+
+    def _empty(self):
+        def copy(node):
+            if isinstance(node, dict):
+                return {key: copy(value) for key, value in node.items()}
+            return []
+        return copy(self._skeleton)
+
+    @staticmethod
+    def _place(json, path, entry):
+        node = json
+        for key in path:
+            node = node[key]
+        node.append(entry)
+
+    def _groups(self):
+        """Group records by (check, expected, found) in first-seen order."""
+        groups = {}
+        for record in self._records:
+            if record.location is None or not self._formats[record.check].aggregatable:
+                groups[id(record)] = [record]
+                continue
+            key = (record.check, repr(record.expected), repr(record.found))
+            groups.setdefault(key, []).append(record)
+        return groups.values()
+
+    def messages(self, aggregate=False):
+        """Render human readable messages.
+
+        :param aggregate: one message per check, expected and found value
+                          with locations collapsed to ranges
+        """
+        if not aggregate:
+            return [self._formats[r.check].render(r) for r in self._records]
+        messages = []
+        for records in self._groups():
+            error_format = self._formats[records[0].check]
+            if len(records) == 1:
+                messages.append(error_format.render(records[0]))
+                continue
+            ranges = _ranges(sorted({r.location for r in records}))
+            messages.append(f"{error_format.render_aggregated(records[0], _ranges_text(ranges))}"
+                            f" ({len(records)} times)")
+        return messages
+
+    def to_json(self, aggregate=False):
+        """Get errors in the skeleton structure.
+
+        :param aggregate: location of aggregated entries is a list of
+                          [first, last] ranges and "count" is added
+        """
+        json = self._empty()
+        if not aggregate:
+            for record in self._records:
+                error_format = self._formats[record.check]
+                self._place(json, error_format.path, error_format.to_json(record))
+            return json
+        for records in self._groups():
+            error_format = self._formats[records[0].check]
+            if len(records) == 1:
+                entry = error_format.to_json(records[0])
+            else:
+                ranges = _ranges(sorted({r.location for r in records}))
+                if isinstance(error_format.json, str):
+                    entry = error_format.to_json(records[0], _ranges_text(ranges))
+                else:
+                    entry = error_format.to_json(records[0], ranges, len(records))
+            self._place(json, error_format.path, entry)
+        return json
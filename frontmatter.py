@@ -0,0 +1,109 @@
+__all__ = ['FrontMatter', 'FRONT_MATTER_LIMIT']
+
+import re
+
+# front matter of an article fits in its first pages
+FRONT_MATTER_LIMIT = 60
+
+_UDC = re.compile(r'[0-9]+[0-9.+*:/\\\[\]]*[A-Z]*')
+_BODY_START = re.compile(r'^\s*(?:\d+\.?\s*)?(?:введение|introduction)\s*\.?\s*$', re.IGNORECASE)
+_INITIALS = re.compile(r'[А-ЯЁA-Z]\.\s?(?:[А-ЯЁA-Z]\.)?\s?[А-ЯЁA-Z][а-яёa-z]+'
+                       r'|[А-ЯЁA-Z][а-яёa-z]+\s[А-ЯЁA-Z]\.\s?(?:[А-ЯЁA-Z]\.)?')
+_AFFILIATION = ('университет', 'институт', 'академи', 'university', 'institute',
+                'academy', 'лаборатор', 'laboratory', '@', 'e-mail', 'email')
+_KEYWORD_SEPARATORS = re.compile(r'[,;]')
+_NOT_LETTERS = re.compile(r'[^A-Za-zА-Яа-я]+')
+
+
+class FrontMatter(object):
+    """Title, UDC, authors, affiliation and keywords from the first paragraphs.
+
+    Only the first limit paragraphs are read and reading stops at the
+    first heading like "Введение" or "Introduction", so with a streaming
+    wrapper a document missing an element is not read to its end.
+    """
+
+    def __init__(self):
+        self.title = None
+        self.title_paragraph = None
+        self.udc = None
+        self.udc_paragraph = None
+        # all UDC candidates of the paragraph with several matches
+        self.udc_candidates = []
+        self.udc_candidates_paragraph = None
+        self.authors = []
+        self.affiliation = []
+        # [(paragraph index, [words])], at most two blocks: Russian and English
+        self.keywords = []
+        self.paragraphs = 0
+        self.body_start = None
+
+    @property
+    def keyword_list(self):
+        return [word for _, words in self.keywords for word in words]
+
+    @classmethod
+    def scan(cls, paragraphs, limit=FRONT_MATTER_LIMIT):
+        """
+        :param paragraphs: iterable of paragraphs with text, e.g.
+                           wrapper.iter_paragraphs()
+        :param limit: maximal number of paragraphs to read
+        """
+
+        front = cls()
+        udc_see_next = False
+        for i, paragraph in enumerate(paragraphs):
+            if i >= limit:
+                break
+            text = paragraph.text
+            if _BODY_START.match(text):
+                front.body_start = i
+                break
+            front.paragraphs = i + 1
+            if not text.strip():
+                continue
+            lower = text.lower()
+            is_udc = "УДК" in text
+            if front.udc is None and (is_udc or udc_see_next):
+                is_udc = True
+                udc_see_next = front._add_udc(i, text, "УДК" in text, udc_see_next)
+            if len(front.keywords) < 2 and ("ключевые слова" in lower or "keywords" in lower):
+                front._add_keywords(i, lower)
+                continue
+            if is_udc:
+                continue
+            if front.title is None:
+                front.title = text.strip()
+                front.title_paragraph = i
+            elif not front.keywords and any(marker in lower for marker in _AFFILIATION):
+                front.affiliation.append(i)
+            elif not front.authors and not front.keywords and _INITIALS.search(text):
+                front.authors = [author.strip() for author in re.split(r'[,;]|\sи\s|\sand\s', text)
+                                 if author.strip()]
+        return front
+
+    def _add_udc(self, i, text, is_udc, see_next):
+        start = 0
+        if is_udc:
+            start = text.find("УДК") + 3
+        udc = _UDC.findall(text[start:])
+        if len(udc) == 1:
+            self.udc = udc[0]
+            self.udc_paragraph = i
+        elif len(udc) > 0:
+            if not self.udc_candidates:
+                self.udc_candidates = udc
+                self.udc_candidates_paragraph = i
+        else:
+            # "УДК" alone, the code is in the next paragraph
+            return not see_next
+        return see_next
+
+    def _add_keywords(self, i, lower):
+        start = lower.find("слова")
+        if start == -1:
+            start = lower.find("keywords") + 9
+        else:
+            start += 5
+        words = [_NOT_LETTERS.sub('', s) for s in _KEYWORD_SEPARATORS.split(lower[start:])]
+        self.keywords.append((i, [word for word in words if word]))
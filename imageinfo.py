@@ -0,0 +1,225 @@
+__all__ = ['ImageInfo', 'probe_image', 'iter_media_info']
+
+import struct
+
+_MEDIA_PREFIX = 'word/media/image'
+_INCH = 0.0254
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_PNG_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+_JPEG_MODES = {1: 'L', 3: 'RGB', 4: 'CMYK'}
+# SOF0..SOF15 except DHT (C4), JPG (C8) and DAC (CC)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+             0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_TIFF_MODES = {0: 'L', 1: 'L', 2: 'RGB', 3: 'P', 5: 'CMYK', 6: 'RGB'}
+_TIFF_TYPE_SIZES = {1: 1, 3: 2, 4: 4, 5: 8}
+
+
+class ImageInfo(object):
+    """Image metadata read from file headers, pixels are never decoded.
+
+    mode follows PIL naming ('L', 'P', 'RGB', ...), dpi is an (x, y) tuple
+    or None when the file does not store resolution. Unknown formats have
+    format, mode and size set to None.
+    """
+
+    __slots__ = ('name', 'format', 'width', 'height', 'mode', 'dpi')
+
+    def __init__(self, name=None, format=None, width=None, height=None,
+                 mode=None, dpi=None):
+        self.name = name
+        self.format = format
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.dpi = dpi
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def __repr__(self):
+        return (f"ImageInfo({self.name!r}, {self.format}, {self.width}x{self.height}, "
+                f"mode={self.mode}, dpi={self.dpi})")
+
+
+def _read_exact(stream, n):
+    data = stream.read(n)
+    if len(data) != n:
+        raise EOFError
+    return data
+
+
+def _probe_png(stream, info):
+    # IHDR is always the first chunk
+    length, chunk_type = struct.unpack('>I4s', _read_exact(stream, 8))
+    if chunk_type != b'IHDR':
+        return
+    width, height, bit_depth, color_type = struct.unpack('>IIBB', _read_exact(stream, 10))
+    _read_exact(stream, length - 10 + 4)
+    info.format = 'PNG'
+    info.width, info.height = width, height
+    info.mode = _PNG_MODES.get(color_type)
+    if color_type == 0 and bit_depth == 1:
+        info.mode = '1'
+    # pHYs must precede IDAT, stop at the first image data chunk
+    while True:
+        length, chunk_type = struct.unpack('>I4s', _read_exact(stream, 8))
+        if chunk_type in (b'IDAT', b'IEND'):
+            return
+        data = _read_exact(stream, length + 4)
+        if chunk_type == b'pHYs':
+            px, py, unit = struct.unpack('>IIB', data[:9])
+            if unit == 1:
+                info.dpi = (px * _INCH, py * _INCH)
+            return
+
+
+def _probe_jpeg(stream, info):
+    info.format = 'JPEG'
+    while True:
+        marker = _read_exact(stream, 2)
+        while marker[0] != 0xFF or marker[1] == 0xFF:
+            marker = marker[1:] + _read_exact(stream, 1)
+        code = marker[1]
+        if code == 0xD8 or 0xD0 <= code <= 0xD7 or code == 0x01:
+            continue
+        if code in (0xD9, 0xDA):
+            return
+        length = struct.unpack('>H', _read_exact(stream, 2))[0]
+        data = _read_exact(stream, length - 2)
+        if code == 0xE0 and data[:5] == b'JFIF\x00' and info.dpi is None:
+            unit, xd, yd = struct.unpack('>BHH', data[7:12])
+            if unit == 1:
+                info.dpi = (xd, yd)
+            elif unit == 2:
+                info.dpi = (xd * 2.54, yd * 2.54)
+        elif code in _JPEG_SOF:
+            height, width, components = struct.unpack('>HHB', data[1:6])
+            info.width, info.height = width, height
+            info.mode = _JPEG_MODES.get(components)
+            return
+
+
+def _probe_gif(stream, info):
+    info.format = 'GIF'
+    info.width, info.height = struct.unpack('<HH', _read_exact(stream, 4))
+    info.mode = 'P'
+
+
+def _probe_bmp(stream, info):
+    info.format = 'BMP'
+    # file size, reserved words and pixel data offset
+    _read_exact(stream, 12)
+    header_size = struct.unpack('<I', _read_exact(stream, 4))[0]
+    dib = _read_exact(stream, header_size - 4)
+    if header_size == 12:
+        width, height, _, bit_count = struct.unpack('<HHHH', dib[:8])
+    else:
+        width, height, _, bit_count = struct.unpack('<iiHH', dib[:12])
+        if header_size >= 40:
+            ppm_x, ppm_y = struct.unpack('<ii', dib[20:28])
+            if ppm_x > 0 and ppm_y > 0:
+                info.dpi = (ppm_x * _INCH, ppm_y * _INCH)
+    info.width, info.height = width, abs(height)
+    if bit_count == 1:
+        info.mode = '1'
+    elif bit_count <= 8:
+        info.mode = 'P'
+    else:
+        info.mode = 'RGB'
+
+
+def _probe_tiff(data, info):
+    # the first IFD may be stored anywhere, so TIFF is probed from the
+    # whole file content instead of the stream
+    info.format = 'TIFF'
+    endian = '<' if data[:2] == b'II' else '>'
+    offset = struct.unpack(endian + 'I', data[4:8])[0]
+    count = struct.unpack(endian + 'H', data[offset:offset + 2])[0]
+    tags = {}
+    for k in range(count):
+        entry = offset + 2 + 12 * k
+        tag, value_type, value_count = struct.unpack(endian + 'HHI', data[entry:entry + 8])
+        size = _TIFF_TYPE_SIZES.get(value_type)
+        if size is None:
+            continue
+        value_offset = entry + 8
+        if size * value_count > 4:
+            value_offset = struct.unpack(endian + 'I', data[entry + 8:entry + 12])[0]
+        if value_type == 1:
+            value = data[value_offset]
+        elif value_type == 3:
+            value = struct.unpack(endian + 'H', data[value_offset:value_offset + 2])[0]
+        elif value_type == 4:
+            value = struct.unpack(endian + 'I', data[value_offset:value_offset + 4])[0]
+        else:
+            numerator, denominator = struct.unpack(endian + 'II', data[value_offset:value_offset + 8])
+            value = numerator / denominator if denominator else 0
+        tags[tag] = value
+    info.width, info.height = tags.get(256), tags.get(257)
+    photometric = tags.get(262)
+    info.mode = _TIFF_MODES.get(photometric)
+    if photometric in (0, 1) and tags.get(258) == 1:
+        info.mode = '1'
+    if 282 in tags and 283 in tags:
+        unit = tags.get(296, 2)
+        if unit == 2:
+            info.dpi = (tags[282], tags[283])
+        elif unit == 3:
+            info.dpi = (tags[282] * 2.54, tags[283] * 2.54)
+
+
+def probe_image(stream, name=None):
+    """Read image format, size, mode and dpi from the file header.
+
+    :param stream: binary file-like object positioned at the image start,
+                   e.g. a member opened from zipfile.ZipFile
+    :param name: name stored in the returned ImageInfo
+    :rtype: ImageInfo
+    """
+
+    info = ImageInfo(name)
+    signature = stream.read(8)
+    try:
+        if signature == _PNG_SIGNATURE:
+            _probe_png(stream, info)
+        elif signature[:2] == b'\xff\xd8':
+            _probe_jpeg(_Prefixed(signature[2:], stream), info)
+        elif signature[:6] in (b'GIF87a', b'GIF89a'):
+            _probe_gif(_Prefixed(signature[6:], stream), info)
+        elif signature[:2] == b'BM':
+            _probe_bmp(_Prefixed(signature[2:], stream), info)
+        elif signature[:4] in (b'II*\x00', b'MM\x00*'):
+            _probe_tiff(signature + stream.read(), info)
+    except (EOFError, struct.error, IndexError):
+        pass
+    return info
+
+
+class _Prefixed(object):
+    """Stream that returns already consumed bytes before the rest."""
+
+    def __init__(self, prefix, stream):
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, n):
+        if not self._prefix:
+            return self._stream.read(n)
+        head, self._prefix = self._prefix[:n], self._prefix[n:]
+        if len(head) < n:
+            head += self._stream.read(n - len(head))
+        return head
+
+
+def iter_media_info(archive, prefix=_MEDIA_PREFIX):
+    """Probe all media of an opened docx zipfile.ZipFile in one pass.
+
+    Nothing is extracted to disk and only headers are decompressed.
+    """
+
+    for entry in archive.infolist():
+        if entry.filename.startswith(prefix):
+            with archive.open(entry) as stream:
+                yield probe_image(stream, entry.filename)
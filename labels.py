@@ -0,0 +1,114 @@
+__all__ = ['LabelIndex', 'LabelMatcher', 'SentenceLabels']
+
+import re
+
+from quantities import NumberIndex
+
+
+class SentenceLabels(object):
+    """Label hits of one sentence."""
+
+    __slots__ = ('text', 'hits', '_numbers')
+
+    def __init__(self, text, hits):
+        self.text = text
+        # {owner: [(start, end)]} in label order, then by position
+        self.hits = hits
+        self._numbers = None
+
+    @property
+    def numbers(self):
+        """NumberIndex of the sentence, built on first use."""
+        if self._numbers is None:
+            self._numbers = NumberIndex(self.text)
+        return self._numbers
+
+    def __contains__(self, owner):
+        return owner in self.hits
+
+    def positions(self, owner):
+        """Get [(start, end)] of labels of owner in the lowered text."""
+        return self.hits.get(owner, [])
+
+
+class LabelMatcher(object):
+    """Labels of ontology properties and values compiled for scanning texts.
+
+    Labels are regular expressions, so they can't go into an Aho-Corasick
+    automaton, and a combined alternation of them is slower in re than
+    scanning with every pattern. Each distinct label is compiled once and
+    a text is lowered once and scanned once per distinct label, so labels
+    shared by several owners are matched once.
+    """
+
+    def __init__(self, owners):
+        """
+        :param owners: iterable of (owner, labels), e.g. properties and
+                       values with their rdfs:label lists
+        """
+        # one pattern per distinct lowercase label: [(pattern, [owners])]
+        self._patterns = []
+        # {owner: [pattern index]} in the order of the owner's labels
+        self._owners = {}
+        indexes = {}
+        for owner, labels in owners:
+            owner_patterns = self._owners.setdefault(owner, [])
+            for label in labels:
+                label = label.lower()
+                if label not in indexes:
+                    indexes[label] = len(self._patterns)
+                    self._patterns.append((re.compile(label), []))
+                k = indexes[label]
+                if k not in owner_patterns:
+                    owner_patterns.append(k)
+                    self._patterns[k][1].append(owner)
+
+    def scan(self, text):
+        """Find all labels in the lowered text, as re.finditer of every
+        label would.
+
+        :return: SentenceLabels of text
+        """
+        lower = text.lower()
+        # {pattern index: [(start, end)]}
+        found = {}
+        for k, (pattern, _) in enumerate(self._patterns):
+            spans = [m.span() for m in pattern.finditer(lower)]
+            if spans:
+                found[k] = spans
+        hits = {}
+        for k in found:
+            for owner in self._patterns[k][1]:
+                if owner not in hits:
+                    hits[owner] = [hit for i in self._owners[owner] for hit in found.get(i, ())]
+        return SentenceLabels(text, hits)
+
+
+class LabelIndex(object):
+    """Inverted index from label owners to the sentences with their labels.
+
+    Sentences are scanned once when the index is built, then the sentences
+    of a property or value are a postings lookup instead of a pass over
+    all sentences.
+    """
+
+    def __init__(self, matcher, sentences):
+        """
+        :param matcher: LabelMatcher of the ontology labels
+        :param sentences: list of str
+        """
+        # [SentenceLabels] in sentence order
+        self.sentences = [matcher.scan(sentence) for sentence in sentences]
+        # {owner: [sentence index]} ascending
+        self.postings = {}
+        for n, labels in enumerate(self.sentences):
+            for owner in labels.hits:
+                self.postings.setdefault(owner, []).append(n)
+
+    def find(self, owner):
+        """Get [SentenceLabels] of sentences with labels of owner."""
+        return [self.sentences[n] for n in self.postings.get(owner, ())]
+
+    def occurrences(self, owner):
+        """Get [(sentence index, [(start, end)])] of labels of owner."""
+        return [(n, self.sentences[n].positions(owner)) for n in self.postings.get(owner, ())]
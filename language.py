@@ -0,0 +1,68 @@
+__all__ = ['CYRILLIC', 'LATIN', 'MIXED', 'classify_words', 'classify_text', 'script_counts']
+
+CYRILLIC = 'cyrillic'
+LATIN = 'latin'
+MIXED = 'mixed'
+
+
+class _ScriptTable(dict):
+    """str.translate table mapping Cyrillic letters to 'c', Latin letters
+    to 'l' and deleting everything else."""
+
+    def __init__(self):
+        # common code points are listed to avoid __missing__ calls
+        super().__init__(dict.fromkeys(range(0x0530), None))
+        for first, last in ((0x0041, 0x005A), (0x0061, 0x007A), (0x00C0, 0x00D6), (0x00D8, 0x00F6),
+                            (0x00F8, 0x024F), (0x1E00, 0x1EFF)):
+            self.update(dict.fromkeys(range(first, last + 1), 'l'))
+        for first, last in ((0x0400, 0x052F), (0x1C80, 0x1C8F), (0x2DE0, 0x2DFF), (0xA640, 0xA69F)):
+            self.update(dict.fromkeys(range(first, last + 1), 'c'))
+
+    def __missing__(self, key):
+        return None
+
+
+_SCRIPTS = _ScriptTable()
+
+
+def script_counts(text):
+    """Get numbers of Cyrillic and Latin letters in text.
+
+    :return: (cyrillic, latin)
+    """
+    scripts = text.translate(_SCRIPTS)
+    cyrillic = scripts.count('c')
+    return cyrillic, len(scripts) - cyrillic
+
+
+def _label(scripts):
+    if 'c' in scripts:
+        return MIXED if 'l' in scripts else CYRILLIC
+    return LATIN if 'l' in scripts else None
+
+
+def classify_words(words):
+    """Classify words by the scripts of their letters in one call.
+
+    :param words: iterable of str
+    :return: list of CYRILLIC, LATIN, MIXED or None for words without letters
+    """
+    return [_label(word.translate(_SCRIPTS)) for word in words]
+
+
+def classify_text(text, threshold=0.8):
+    """Classify a paragraph or any longer text by the share of its letters.
+
+    :param threshold: share of letters of one script needed for CYRILLIC
+                      or LATIN, MIXED otherwise
+    :return: CYRILLIC, LATIN, MIXED or None for text without letters
+    """
+    cyrillic, latin = script_counts(text)
+    total = cyrillic + latin
+    if total == 0:
+        return None
+    if cyrillic >= threshold * total:
+        return CYRILLIC
+    if latin >= threshold * total:
+        return LATIN
+    return MIXED
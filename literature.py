@@ -0,0 +1,97 @@
+__all__ = ['Bibliography', 'Reference']
+
+import re
+from array import array
+from bisect import bisect_left
+
+from language import LATIN, classify_text
+
+_DOI = re.compile(r'10\.\d{4,9}/\S+')
+_YEAR = re.compile(r'(?<!\d)(1[5-9]\d\d|20\d\d)(?!\d)')
+# "1.", "1)", "[1]" before an entry
+_NUMBERING = re.compile(r'^\s*\[?\d{1,4}[.)\]]\s*')
+_SURNAME = re.compile(r'[А-ЯЁA-Z][а-яёa-z]+(?:-[А-ЯЁA-Z][а-яёa-z]+)?')
+
+
+class Reference(object):
+    """One entry of a reference list."""
+
+    __slots__ = ('paragraph', 'text', 'year', 'doi', 'script')
+
+    def __init__(self, paragraph, text):
+        self.paragraph = paragraph
+        self.text = text
+        years = _YEAR.findall(text)
+        # the publication year is the latest year mentioned
+        self.year = max(map(int, years)) if years else None
+        doi = _DOI.search(text)
+        self.doi = doi.group(0).rstrip('.,;') if doi else None
+        self.script = classify_text(text)
+
+
+class Bibliography(object):
+    """Reference list with per-entry arrays for counting requirements.
+
+    Entries are parsed once, then every count over them (DOI, foreign,
+    newer or older than a year) is a sum over a flat array or a bisect in
+    the sorted years.
+    """
+
+    def __init__(self, entries=()):
+        """
+        :param entries: Reference objects
+        """
+        self.entries = list(entries)
+        self.years = array('H', (entry.year or 0 for entry in self.entries))
+        self.doi = bytearray(entry.doi is not None for entry in self.entries)
+        self.foreign = bytearray(entry.script == LATIN for entry in self.entries)
+        self._sorted_years = sorted(self.years)
+        self._unknown_years = bisect_left(self._sorted_years, 1)
+
+    @classmethod
+    def from_paragraphs(cls, paragraphs):
+        """Split reference list paragraphs into entries.
+
+        :param paragraphs: [(paragraph index, text)] of the reference list
+                           without its heading
+        """
+        entries = []
+        for i, text in paragraphs:
+            # entries sharing a paragraph are separated by line breaks
+            for part in text.split('\n'):
+                part = _NUMBERING.sub('', part).strip()
+                if len(part) > 3:
+                    entries.append(Reference(i, part))
+        return cls(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def count_doi(self):
+        return sum(self.doi)
+
+    def count_foreign(self):
+        return sum(self.foreign)
+
+    def count_since(self, year):
+        """Get number of entries published in year or later."""
+        return len(self._sorted_years) - bisect_left(self._sorted_years, year)
+
+    def count_before(self, year):
+        """Get number of entries with a known year before year."""
+        return bisect_left(self._sorted_years, year) - self._unknown_years
+
+    def count_self_citations(self, authors):
+        """Get number of entries naming any of authors.
+
+        :param authors: author strings like 'Иванов И.И.', surnames are
+                        taken from them
+        """
+        surnames = set()
+        for author in authors:
+            surnames.update(_SURNAME.findall(author))
+        if not surnames:
+            return 0
+        pattern = re.compile(r'(?<![а-яёa-z])(?:%s)(?![а-яёa-z])' % '|'.join(map(re.escape, sorted(surnames))),
+                             re.IGNORECASE)
+        return sum(1 for entry in self.entries if pattern.search(entry.text))
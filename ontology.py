@@ -0,0 +1,137 @@
+__all__ = ['ApplicableValue', 'OntologyIndex', 'load_ontology']
+
+import glob
+import hashlib
+import os
+import sqlite3
+import tempfile
+
+import owlready2
+from owlready2 import World, default_world, get_ontology
+
+_APPLICABLE_TO_IRI = "file://document#applicableTo"
+_APPLICABLE_TO = ("PREFIX : <file://document#> "
+                  "SELECT ?x ?p "
+                  "WHERE { ?x :applicableTo ?p }")
+_SNAPSHOT_SUFFIX = '.sqlite3'
+
+
+class ApplicableValue(object):
+    """Value of the ontology applicable to a property."""
+
+    __slots__ = ('value', 'labels', 'kind')
+
+    def __init__(self, value):
+        # owlready2 individual or class, e.g. document.Arial or document.Pt
+        self.value = value
+        self.labels = list(value.label)
+        # name of the Value subclass, e.g. 'EnumValue' or 'QuantitativeValue'
+        self.kind = value.is_a[0].name if value.is_a else None
+
+    def __repr__(self):
+        return f"ApplicableValue({self.value}, {self.labels}, {self.kind})"
+
+
+class OntologyIndex(object):
+    """Applicable values of every property of a loaded ontology.
+
+    All applicableTo triples are fetched at once, so finding the values of
+    a property is a dict lookup instead of a query per property.
+    """
+
+    def __init__(self, world=default_world):
+        """
+        :param world: owlready2 World the ontology is loaded into
+        """
+        # {property: [ApplicableValue]}
+        self.values = {}
+        # one ApplicableValue per value shared by all its properties
+        applicable = {}
+        applicable_to = world[_APPLICABLE_TO_IRI]
+        if applicable_to is not None:
+            # one scan of the quadstore, much cheaper than compiling SPARQL
+            relations = applicable_to.get_relations()
+        else:
+            # the property is declared under another IRI than its triples
+            # use, e.g. when the ontology is loaded from an absolute path
+            relations = world.sparql(_APPLICABLE_TO)
+        for value, prop in relations:
+            if value not in applicable:
+                applicable[value] = ApplicableValue(value)
+            self.values.setdefault(prop, []).append(applicable[value])
+
+    def values_of(self, prop):
+        """Get [ApplicableValue] of prop in ontology order."""
+        return self.values.get(prop, [])
+
+
+def _snapshot_path(cache_dir, ontology_filename, iri):
+    digest = hashlib.sha256()
+    with open(ontology_filename, 'rb') as f:
+        digest.update(f.read())
+    # stored IRIs depend on how the file is named and the quadstore
+    # format on the owlready2 version
+    digest.update(iri.encode('utf-8'))
+    digest.update(owlready2.VERSION.encode('utf-8'))
+    # files of the same name in other directories keep their own snapshots
+    source = hashlib.sha256(iri.encode('utf-8')).hexdigest()[:8]
+    stem = os.path.splitext(os.path.basename(ontology_filename))[0] + '-' + source
+    return os.path.join(cache_dir, f"{stem}-{digest.hexdigest()[:16]}{_SNAPSHOT_SUFFIX}"), stem
+
+
+def _build_snapshot(path, stem, iri):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=_SNAPSHOT_SUFFIX, dir=directory)
+    os.close(fd)
+    try:
+        world = World(filename=tmp)
+        world.get_ontology(iri).load()
+        world.save()
+        world.close()
+        # readers never see a partly written snapshot
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    for old in glob.glob(os.path.join(directory, glob.escape(stem) + '-*' + _SNAPSHOT_SUFFIX)):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+
+def load_ontology(ontology_filename, cache_dir=None):
+    """Load an OWL file, reusing its quadstore snapshot from cache_dir.
+
+    The snapshot is owlready2's SQLite quadstore of the parsed file, keyed
+    by the file path and hash, so a changed file gets a new snapshot and
+    replaces only the snapshots of the same path. It is copied into an
+    in-memory World of the caller, individuals created while parsing
+    requirements never reach the cache and several processes can share
+    one cache directory.
+
+    :param ontology_filename: path of the OWL file
+    :param cache_dir: directory for snapshots, None loads the file into
+                      default_world without caching
+    :return: owlready2 Ontology
+    """
+    iri = "file://" + ontology_filename
+    if cache_dir is None:
+        return get_ontology(iri).load()
+    path, stem = _snapshot_path(cache_dir, ontology_filename, iri)
+    if not os.path.exists(path):
+        _build_snapshot(path, stem, iri)
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    snapshot = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        snapshot.backup(connection)
+    finally:
+        snapshot.close()
+    # the ontology is stored under the base IRI declared in the file, the
+    # file IRI is its alias
+    alias = connection.execute("SELECT iri FROM ontology_alias WHERE alias=?",
+                               (iri if iri.endswith(('#', '/')) else iri + '#',)).fetchone()
+    world = World(filename=path, connection=connection)
+    return world.get_ontology(alias[0] if alias else iri).load()
@@ -0,0 +1,62 @@
+__all__ = ['write_package']
+
+import copy
+import struct
+import zipfile
+
+_LOCAL_HEADER_SIZE = 30
+_DATA_DESCRIPTOR = 0x08
+
+
+def _read_raw(source_fp, zinfo):
+    """Read compressed member data as stored in the source archive."""
+    source_fp.seek(zinfo.header_offset)
+    header = source_fp.read(_LOCAL_HEADER_SIZE)
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    source_fp.seek(name_length + extra_length, 1)
+    return source_fp.read(zinfo.compress_size)
+
+
+def _copy_raw(source_fp, target, zinfo):
+    """Append member to target without decompressing and recompressing it."""
+    data = _read_raw(source_fp, zinfo)
+    zinfo = copy.copy(zinfo)
+    # sizes and CRC are known, so the local header carries them directly
+    zinfo.flag_bits &= ~_DATA_DESCRIPTOR
+    zinfo.header_offset = target.fp.tell()
+    target.fp.write(zinfo.FileHeader())
+    target.fp.write(data)
+    target.start_dir = target.fp.tell()
+    target.filelist.append(zinfo)
+    target.NameToInfo[zinfo.filename] = zinfo
+
+
+def write_package(source, destination, parts):
+    """Write a copy of a docx package in one pass over its members.
+
+    Members listed in parts are replaced, all others are copied raw without
+    recompression, so the output has exactly one entry per member.
+
+    :param source: path or binary file-like object of the original docx
+    :param destination: path or binary file-like object of the new docx
+    :param parts: {member name: bytes or callable(bytes) -> bytes or None},
+                  a callable returning None keeps the original member
+    :return: names of members whose content was replaced
+    :rtype: list
+    """
+
+    replaced = []
+    with zipfile.ZipFile(source) as archive, \
+            zipfile.ZipFile(destination, 'w', zipfile.ZIP_DEFLATED) as target:
+        for zinfo in archive.infolist():
+            part = parts.get(zinfo.filename)
+            if callable(part):
+                part = part(archive.read(zinfo))
+            if part is not None:
+                new_info = zipfile.ZipInfo(zinfo.filename, zinfo.date_time)
+                new_info.external_attr = zinfo.external_attr
+                target.writestr(new_info, part, zipfile.ZIP_DEFLATED)
+                replaced.append(zinfo.filename)
+            else:
+                _copy_raw(archive.fp, target, zinfo)
+    return replaced
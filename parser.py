@@ -8,6 +8,10 @@ from nltk import sent_tokenize
 import re
 from owlready2 import *
 
+from labels import LabelIndex, LabelMatcher
+from ontology import OntologyIndex, load_ontology
+from quantities import NumberIndex
+
 _namespaces = {'w': "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
 _LEFT_RIGHT_IMPORTANCE = 10
 
@@ -67,162 +71,91 @@ def text_contains_word_from_list(text: str, list):
     return False
 
 
-def find_numbers_near(text: str, i: int, delta: int, right: bool):
-    res = []
-    start = i
-    end = i
-    if right:
-        end += delta
-    else:
-        start -= delta
-    regexp = re.compile(r'-?\d+\.\d+|\d+,\d+|\d+')
-    tmp = regexp.findall(text, start, end)
-    if tmp is None:
-        return []
-    for t in tmp:
-        dist = abs(text.find(t, start, end))
-        res.append([t, dist])
-    return res
-
-
-def get_number(text, start_i):
-    i = start_i
-    s = ""
-    while text[i].isspace():
-        i += 1
-    while text[i].isdigit() or text[i] == '.' or text[i] == ',':
-        s += text[i]
-        i += 1
-    if s == "" or s == "," or s == ".":
-        return None
-    else:
-        return float(s.replace(',', '.'))
-
-def get_quantitative_value(text: str, prop_label_list, value_label_list):
-    print(text)
+def _number_for_label(text, numbers, j, j_end):
+    # "14 пт": the number right before the value label
+    number = numbers.preceding(j, text)
+    if number is None:
+        middle = (j + j_end) // 2
+        number = numbers.nearest(middle, middle - 10 - (j_end - j) // 2, right=False)
+    return None if number is None else number[0]
+
+
+def get_quantitative_value(text: str, prop_hits, value_hits, numbers=None):
+    """
+    :param text: sentence
+    :param prop_hits: [(start, end)] of property labels in the sentence
+    :param value_hits: [(start, end)] of value labels in the sentence
+    :param numbers: NumberIndex of the sentence
+    """
+    if numbers is None:
+        numbers = NumberIndex(text)
     min_dist = 1000
     res_value = None
     # find prop label i
-    for l_p in prop_label_list:
-        regexp1 = re.compile(l_p)
-        for m1 in regexp1.finditer(text.lower()):
-            i = m1.start()
-            print(m1)
-            i1 = i
-            i2 = i
-            while i1 > 0 and text[i1] != '.':
-                i1 -= 1
-            while i2 < len(text) and text[i2] != '.':
-                i2 += 1
-            for l_v in value_label_list:
-                regexp2 = re.compile(l_v)
-                for m2 in regexp2.finditer(text.lower(), i1, i2):
-                    j = m2.start()
-                    dist1 = abs(i - j)
-                    k = j-1
-                    while k >= 0 and text[k].isspace():
-                        k -= 1
-                    while k >= 0 and (text[k].isdigit() or text[k] == "," or text[k] == "."):
-                        k -= 1
-                    value = get_number(text, k)
-                    dist = 0
-                    if value is None:
-                        l = find_numbers_near(text, (j + m2.end()) // 2, 10 + abs(m2.end() - j) // 2, False)
-                        if len(l) == 0:
-                            continue
-                        value, dist = l[0]
-                        for v, d in l:
-                            if d < dist:
-                                value, dist = v, d
-                    if dist1 < min_dist:
-                        min_dist = dist1
-                        res_value = value
-                    if res_value is None:
-                        for m2 in regexp2.finditer(text.lower()):
-                            print(m2)
-                            j = m2.start()
-                            dist1 = abs(i - j)
-                            k = j - 1
-                            while k >= 0 and text[k].isspace():
-                                k -= 1
-                            while k >= 0 and (text[k].isdigit() or text[k] == "," or text[k] == "."):
-                                k -= 1
-                            value = get_number(text, k)
-                            dist = 0
-                            if value is None:
-                                l = find_numbers_near(text, (j + m2.end()) // 2, 10 + abs(m2.end() - j) // 2, False)
-                                if len(l) == 0:
-                                    continue
-                                value, dist = l[0]
-                                for v, d in l:
-                                    if d < dist:
-                                        value, dist = v, d
-                            if dist1 < min_dist:
-                                min_dist = dist1
-                                res_value = value
-    print("Added value, min_dist ", res_value, min_dist)
+    for i, _ in prop_hits:
+        start, end = numbers.clause(i)
+        in_clause = [(j, j_end) for j, j_end in value_hits if start <= j and j_end <= end]
+        # value labels of the clause of the property label are preferred,
+        # the whole sentence is searched only if nothing was found yet
+        for candidates in (in_clause, value_hits):
+            for j, j_end in candidates:
+                dist1 = abs(i - j)
+                if dist1 >= min_dist:
+                    continue
+                value = _number_for_label(text, numbers, j, j_end)
+                if value is not None:
+                    min_dist = dist1
+                    res_value = value
+            if res_value is not None:
+                break
     return res_value, min_dist
 
 
-def get_labels_dist(text: str, prop_label_list, value_label_list):
+def get_labels_dist(prop_hits, value_hits):
+    """
+    :param prop_hits: [(start, end)] of property labels in a sentence
+    :param value_hits: [(start, end)] of value labels in the sentence
+    """
     min_dist = 1000
     min_value_is_right = True
     # find prop label i
-    for l_p in prop_label_list:
-        regexp1 = re.compile(l_p)
-        for m1 in regexp1.finditer(text.lower()):
-            i = m1.start()
-            for l_v in value_label_list:
-                regexp2 = re.compile(l_v)
-                for m2 in regexp2.finditer(text.lower()):
-                    j = m2.start()
-                    if min_value_is_right:
-                        if j < i:
-                            min_value_is_right = False
-                            min_dist = abs(i - j)
-                        elif min_dist > abs(i - j):
-                            min_dist = abs(i - j)
-                    else:
-                        if j < i and min_dist > abs(i - j):
-                            min_dist = abs(i - j)
+    for i, _ in prop_hits:
+        for j, _ in value_hits:
+            if min_value_is_right:
+                if j < i:
+                    min_value_is_right = False
+                    min_dist = abs(i - j)
+                elif min_dist > abs(i - j):
+                    min_dist = abs(i - j)
+            else:
+                if j < i and min_dist > abs(i - j):
+                    min_dist = abs(i - j)
     return min_dist, min_value_is_right
 
 
-def get_applicable_values_from_property(prop):
-    prop_name = f"{prop}".split(".")[1]
-    request = (f"PREFIX : <file://document#> "
-               f"SELECT ?x "
-               f"WHERE ""{ ?x :applicableTo "
-               f":{prop_name} "
-               "}")
-    return list(default_world.sparql(request))
-
-
-def get_values_of_labeled_property_in_sentences(prop, sentences):
-    responses = get_applicable_values_from_property(prop)
+def get_values_of_labeled_property_in_sentences(prop, sentences, values):
     values_found = []
-    for r in responses:
-        value_obj = r[0]
+    for applicable in values:
+        value_obj = applicable.value
         for s in sentences:
-            if text_contains_word_from_list(s, value_obj.label):
+            if value_obj in s:
                 values_found.append(value_obj)
     return values_found
 
 
-def get_values_of_quantitative_property_in_sentences(prop, sentences):
+def get_values_of_quantitative_property_in_sentences(prop, sentences, values):
     #print(prop)
-    responses = get_applicable_values_from_property(prop)
     values_found = []
     min_dist = 1000
     nearest_value = None
-    for r in responses:
-        value_obj = r[0]
+    for applicable in values:
+        value_obj = applicable.value
         #print(value_obj)
         for s in sentences:
             #print(s)
-            if text_contains_word_from_list(s, value_obj.label):
+            if value_obj in s:
                 #print("Labels ", value_obj.label)
-                value, distance = get_quantitative_value(s, prop.label, value_obj.label)
+                value, distance = get_quantitative_value(s.text, s.positions(prop), s.positions(value_obj), s.numbers)
                 #print("value, distance = ", value, ", ", distance)
                 if min_dist > distance and value is not None and value != "":
                     #print("NEW VALUES:", value, distance)
@@ -246,18 +179,17 @@ def get_values_of_quantitative_property_in_sentences(prop, sentences):
     return values_found
 
 
-def get_values_of_permission_property_in_sentences(prop, sentences):
-    responses = get_applicable_values_from_property(prop)
+def get_values_of_permission_property_in_sentences(prop, sentences, values):
     values_found = []
     min_dist_right = 1000
     min_obj_right = None
     min_dist_left = 1000
     min_obj_left = None
-    for r in responses:
-        value_obj = r[0]
+    for applicable in values:
+        value_obj = applicable.value
         for s in sentences:
-            if text_contains_word_from_list(s, value_obj.label):
-                distance, min_value_is_right = get_labels_dist(s, prop.label, value_obj.label)
+            if value_obj in s:
+                distance, min_value_is_right = get_labels_dist(s.positions(prop), s.positions(value_obj))
                 if min_value_is_right:
                     if distance < min_dist_right:
                         min_dist_right = distance
@@ -273,22 +205,21 @@ def get_values_of_permission_property_in_sentences(prop, sentences):
     return values_found
 
 
-def get_topic_values_in_sentences(prop, sentences):
+def get_topic_values_in_sentences(prop, sentences, values):
     values_found = []
     # nlp
     return values_found
 
 
-def get_enum_values_in_sentences(prop, sentences):
-    responses = get_applicable_values_from_property(prop)
+def get_enum_values_in_sentences(prop, sentences, values):
     values_found = []
     min_dist = 1000
     min_value = None
-    for r in responses:
-        value_obj = r[0]
+    for applicable in values:
+        value_obj = applicable.value
         for s in sentences:
-            if text_contains_word_from_list(s, value_obj.label):
-                distance, t = get_labels_dist(s, prop.label, value_obj.label)
+            if value_obj in s:
+                distance, t = get_labels_dist(s.positions(prop), s.positions(value_obj))
                 if min_dist > distance:
                     values_found.append(min_value)
                     min_dist = distance
@@ -300,23 +231,28 @@ def get_enum_values_in_sentences(prop, sentences):
     return values_found
 
 
-def get_min_values_in_sentences(prop, sentences):
-    responses = get_applicable_values_from_property(prop)
+def get_min_values_in_sentences(prop, sentences, values):
     values_found = []
     return values_found
-def get_max_values_in_sentences(prop, sentences):
-    responses = get_applicable_values_from_property(prop)
+def get_max_values_in_sentences(prop, sentences, values):
     values_found = []
     return values_found
 
 class RequirementsReader:
-    def __init__(self, requirements_filename, ontology_filename):
+    def __init__(self, requirements_filename, ontology_filename, cache_dir=None):
+        """
+        :param requirements_filename: docx file in in/
+        :param ontology_filename: OWL file of the ontology
+        :param cache_dir: directory for ontology snapshots reused by later
+                          readers, None parses the OWL file every time
+        """
         z = zipfile.ZipFile('in/' + requirements_filename)
         marked_up_docx = z.open("word/document.xml")
         self.__etree = et.parse(marked_up_docx)
         self.__root = self.__etree.getroot()
 
-        self.ontology = get_ontology("file://" + ontology_filename).load()
+        self.ontology = load_ontology(ontology_filename, cache_dir)
+        self.index = OntologyIndex(self.ontology.world)
 
         self.requirements_decoration = []
         self.requirements_structure = []
@@ -332,43 +268,54 @@ class RequirementsReader:
         self.text = prepare_text(self.text)
         self.sentences = split_to_sentences(self.text)
 
+        # [(property class, [property])] of DecorationProperty,
+        # StructureProperty and VolumeProperty
+        self.properties = [(prop_class, self.get_property_instances(prop_class))
+                           for prop_class in [self.ontology.DecorationProperty, self.ontology.StructureProperty,
+                                              self.ontology.VolumeProperty]]
+        owners = [(prop, prop.label) for _, instances in self.properties for prop in instances]
+        owners.extend((applicable.value, applicable.labels)
+                      for values in self.index.values.values() for applicable in values)
+        self.matcher = LabelMatcher(owners)
+        # every sentence is scanned for all labels once
+        self.label_index = LabelIndex(self.matcher, self.sentences)
+
+    def get_property_instances(self, prop_class):
+        instances = self.ontology.get_instances_of(prop_class)
+        next_generation = self.ontology.get_children_of(prop_class)
+        while len(next_generation) != 0:
+            new_generation = []
+            for c in next_generation:
+                instances.extend(self.ontology.get_instances_of(c))
+                new_generation.extend(self.ontology.get_children_of(c))
+            next_generation = new_generation
+        return instances
+
     def get_all_paragraphs(self):
         elements = self.__root.findall('.//w:p', _namespaces)
         return elements
 
     def parse_requirements(self):
-        for i, prop_class in enumerate(
-                [self.ontology.DecorationProperty, self.ontology.StructureProperty,
-                 self.ontology.VolumeProperty]):
-            instances = self.ontology.get_instances_of(prop_class)
-            next_generation = self.ontology.get_children_of(prop_class)
-            while len(next_generation) != 0:
-                new_generation = []
-                for c in next_generation:
-                    instances.extend(self.ontology.get_instances_of(c))
-                    new_generation.extend(self.ontology.get_children_of(c))
-                next_generation = new_generation
+        for i, (prop_class, instances) in enumerate(self.properties):
             for prop in instances:
-                include_sentences = []
-                for s in self.sentences:
-                    if text_contains_word_from_list(s, prop.label):
-                        include_sentences.append(s)
+                include_sentences = self.label_index.find(prop)
                 if len(include_sentences) == 0: continue
+                values = self.index.values_of(prop)
                 values_found = []
                 if self.ontology.EnumProperty in list(self.ontology.get_parents_of(prop)):
-                    values_found.extend(get_enum_values_in_sentences(prop, include_sentences))
+                    values_found.extend(get_enum_values_in_sentences(prop, include_sentences, values))
                 elif self.ontology.QuantitativeProperty in list(self.ontology.get_parents_of(prop)):
-                    values_found.extend(get_values_of_quantitative_property_in_sentences(prop, include_sentences))
+                    values_found.extend(get_values_of_quantitative_property_in_sentences(prop, include_sentences, values))
                 elif self.ontology.PermissionProperty in list(self.ontology.get_parents_of(prop)):
-                    values_found.extend(get_values_of_permission_property_in_sentences(prop, include_sentences))
+                    values_found.extend(get_values_of_permission_property_in_sentences(prop, include_sentences, values))
                 elif self.ontology.TopicProperty in list(self.ontology.get_parents_of(prop)):
-                    values_found.extend(get_topic_values_in_sentences(prop, include_sentences))
+                    values_found.extend(get_topic_values_in_sentences(prop, include_sentences, values))
                 elif self.ontology.LabeledProperty in list(self.ontology.get_parents_of(prop)):
-                    values_found.extend(get_values_of_labeled_property_in_sentences(prop, include_sentences))
+                    values_found.extend(get_values_of_labeled_property_in_sentences(prop, include_sentences, values))
                 elif self.ontology.MinProperty in list(self.ontology.get_parents_of(prop)):
-                    values_found.extend(get_min_values_in_sentences(prop, include_sentences))
+                    values_found.extend(get_min_values_in_sentences(prop, include_sentences, values))
                 elif self.ontology.MaxProperty in list(self.ontology.get_parents_of(prop)):
-                    values_found.extend(get_max_values_in_sentences(prop, include_sentences))
+                    values_found.extend(get_max_values_in_sentences(prop, include_sentences, values))
                 if len(values_found) == 0: continue
                 self.requirements[i].append([prop, values_found])
 
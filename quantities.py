@@ -0,0 +1,78 @@
+__all__ = ['NumberIndex']
+
+import re
+from bisect import bisect_left, bisect_right
+
+# "14", "1,5", "1.25"
+_NUMBER = re.compile(r'\d+(?:[.,]\d+)?')
+# clause ends, periods inside numbers are matched by _NUMBER first
+_CLAUSE_END = re.compile(r'\d+(?:[.,]\d+)?|(\.)')
+
+
+class NumberIndex(object):
+    """Numbers of a sentence with their offsets, found in one scan.
+
+    Nearest numbers to a position are found by bisect in the sorted
+    offsets, instead of scanning the text around every label.
+    """
+
+    __slots__ = ('starts', 'ends', 'values', 'clause_ends', 'length')
+
+    def __init__(self, text):
+        self.starts = []
+        self.ends = []
+        # float values, decimal comma is normalized
+        self.values = []
+        for m in _NUMBER.finditer(text):
+            self.starts.append(m.start())
+            self.ends.append(m.end())
+            self.values.append(float(m.group(0).replace(',', '.')))
+        self.clause_ends = [m.start() for m in _CLAUSE_END.finditer(text) if m.group(1) is not None]
+        self.length = len(text)
+
+    def __len__(self):
+        return len(self.values)
+
+    def clause(self, i):
+        """Get [start, end) of the clause around position i bounded by
+        periods that are not part of numbers."""
+        k = bisect_right(self.clause_ends, i)
+        start = self.clause_ends[k - 1] if k > 0 else 0
+        end = self.clause_ends[k] if k < len(self.clause_ends) else self.length
+        return start, end
+
+    def preceding(self, i, text=None):
+        """Get the number ending nearest before position i.
+
+        :param text: the indexed text, if given the number is only returned
+                     when there is nothing but whitespace between it and i
+        :return: (value, distance from the number end to i) or None
+        """
+        k = bisect_right(self.ends, i) - 1
+        if k < 0:
+            return None
+        if text is not None and text[self.ends[k]:i].strip():
+            return None
+        return self.values[k], i - self.ends[k]
+
+    def nearest(self, i, start=0, end=None, right=None):
+        """Get the number nearest to position i inside [start, end).
+
+        :param right: True looks only after i, False only before i, None
+                      both ways
+        :return: (value, distance between i and the number) or None
+        """
+        if end is None:
+            end = self.length
+        k = bisect_left(self.starts, i)
+        if k > 0 and i < self.ends[k - 1] and self.starts[k - 1] >= start:
+            # i is inside a number
+            return self.values[k - 1], 0
+        best = None
+        if right is not True and k > 0 and self.starts[k - 1] >= start:
+            best = (self.values[k - 1], i - self.ends[k - 1])
+        if right is not False and k < len(self.starts) and self.ends[k] <= end:
+            distance = self.starts[k] - i
+            if best is None or distance < best[1]:
+                best = (self.values[k], distance)
+        return best
@@ -0,0 +1,146 @@
+__all__ = ['Section', 'SectionIndex', 'SECTION_HEADINGS']
+
+import re
+
+# localized heading vocabularies, lowercase with ё replaced by е
+SECTION_HEADINGS = {
+    'annotation': ('аннотация', 'реферат', 'резюме', 'abstract', 'summary'),
+    'keywords': ('ключевые слова', 'keywords', 'key words'),
+    'introduction': ('введение', 'introduction'),
+    'purpose': ('цель', 'цели', 'цель работы', 'цель исследования', 'цели и задачи', 'постановка задачи',
+                'purpose', 'aim', 'aims', 'objective', 'objectives'),
+    'materials_methods': ('материалы и методы', 'методы', 'методы исследования', 'методология', 'методика',
+                          'materials and methods', 'methods', 'methodology'),
+    'results': ('результаты', 'результаты исследования', 'результаты и обсуждение', 'results',
+                'results and discussion'),
+    'significance': ('значимость', 'практическая значимость', 'научная значимость', 'significance'),
+    'discussion': ('обсуждение', 'обсуждение результатов', 'discussion'),
+    'conclusion': ('заключение', 'выводы', 'вывод', 'заключение и выводы', 'conclusion', 'conclusions'),
+    'financing': ('финансирование', 'источник финансирования', 'funding', 'financing'),
+    'gratitude': ('благодарности', 'благодарность', 'acknowledgements', 'acknowledgments'),
+    'literature': ('список литературы', 'литература', 'список источников', 'список использованных источников',
+                   'библиографический список', 'references', 'bibliography'),
+}
+
+_HEADINGS = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+# numbering like "1.", "2.3", "IV." before the heading text
+_NUMBERING = re.compile(r'^(?:[ivxlc]+|\d+(?:\.\d+)*)[.)]?\s+')
+# heading followed by its text in the same paragraph, e.g. "Аннотация: ..."
+_INLINE = re.compile(r'^([^\W\d_]+(?:\s[^\W\d_]+){0,3})\s*[.:—–-]\s*\S')
+_HEADING_LENGTH = 80
+_HEADING_STYLES = ('heading', 'заголовок', 'title')
+# "Heading 2", "Заголовок 3"
+_STYLE_LEVEL = re.compile(r'(\d+)\s*$')
+# level of headings without a heading style, e.g. a known heading in bold
+_TEXT_LEVEL = 1
+
+
+class Section(object):
+    """Document part between two headings."""
+
+    __slots__ = ('name', 'heading', 'level', 'start', 'end')
+
+    def __init__(self, name, heading, start, level=_TEXT_LEVEL):
+        # key from SECTION_HEADINGS or None for other headings
+        self.name = name
+        # paragraph index of the heading
+        self.heading = heading
+        # heading level, 1 for top level headings and titles
+        self.level = level
+        # paragraphs [start, end) of the section text
+        self.start = start
+        self.end = None
+
+    def __repr__(self):
+        return f"Section({self.name}, {self.heading}, {self.level}, {self.start}, {self.end})"
+
+
+def _normalize(text):
+    text = text.strip().lower().replace('ё', 'е')
+    text = _NUMBERING.sub('', text)
+    return text.rstrip(' .:')
+
+
+def _heading_level(style):
+    """Get heading level of a paragraph style or None for other styles."""
+    name = getattr(style, 'name', None)
+    if name is None:
+        return None
+    name = name.lower()
+    if not name.startswith(_HEADING_STYLES):
+        return None
+    level = _STYLE_LEVEL.search(name)
+    return int(level.group(1)) if level is not None else _TEXT_LEVEL
+
+
+class SectionIndex(object):
+    """Sections of a document found in one pass over its paragraphs.
+
+    A paragraph starts a section if its text is a known heading, or a known
+    heading followed by ':' or '.' and the section text, or if it has a
+    heading style. A named section is closed only by a heading of the same
+    or a higher level, its subheadings are part of it. Sizes come from
+    TextStatistics prefix sums, so every section check is O(1) after the
+    traversal.
+    """
+
+    def __init__(self):
+        self.sections = []
+        # {name: [Section]}
+        self.by_name = {}
+        self.paragraphs = 0
+
+    def add(self, paragraph_index, text, paragraph=None):
+        """Classify one paragraph, paragraphs must be added in document order.
+
+        :param paragraph: object with the paragraph style as style, it is
+                          only read for paragraphs short enough to be
+                          headings
+        """
+        self.paragraphs = paragraph_index + 1
+        if not text.strip():
+            return
+        if len(text) <= _HEADING_LENGTH:
+            name = _HEADINGS.get(_normalize(text))
+            level = _heading_level(getattr(paragraph, 'style', None))
+            if name is not None or level is not None:
+                self._start(name, paragraph_index, paragraph_index + 1,
+                            _TEXT_LEVEL if level is None else level)
+                return
+        inline = _INLINE.match(_normalize(text[:_HEADING_LENGTH]))
+        if inline is not None:
+            name = _HEADINGS.get(inline.group(1))
+            if name is not None:
+                # the heading paragraph is part of the section text
+                self._start(name, paragraph_index, paragraph_index)
+
+    def _start(self, name, heading, start, level=_TEXT_LEVEL):
+        if self.sections and self.sections[-1].end is None:
+            current = self.sections[-1]
+            if current.name is not None and level > current.level:
+                # subheading of a named section
+                return
+            current.end = heading
+        section = Section(name, heading, start, level)
+        self.sections.append(section)
+        if name is not None:
+            self.by_name.setdefault(name, []).append(section)
+
+    def finish(self):
+        """Close the last section at the end of the document."""
+        if self.sections and self.sections[-1].end is None:
+            self.sections[-1].end = self.paragraphs
+
+    def find(self, name):
+        """Get the first section of name or None."""
+        sections = self.by_name.get(name)
+        return sections[0] if sections else None
+
+    def size(self, name, statistics, kind='words'):
+        """Get size of all sections of name.
+
+        :param statistics: TextStatistics of the document paragraphs
+        :param kind: one of TextStatistics.kinds
+        """
+        return sum(statistics.count(kind, section.start, section.end)
+                   for section in self.by_name.get(name, ()))
@@ -0,0 +1,266 @@
+__all__ = ['StreamingDocumentWrapper']
+
+import copy
+
+import lxml.etree as et
+from docx.enum.section import WD_SECTION_START
+from docx.enum.shape import WD_INLINE_SHAPE
+from docx.shared import Emu
+
+from styles import FontRecord, ParagraphFormatRecord, StyleTable
+from wrapper import DocumentWrapper
+
+_namespaces = {
+    'w': "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    'wp': "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing",
+    'a': "http://schemas.openxmlformats.org/drawingml/2006/main",
+    'r': "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+}
+_W = '{%s}' % _namespaces['w']
+_BODY = _W + 'body'
+_P = _W + 'p'
+_R = _W + 'r'
+_TBL = _W + 'tbl'
+_SECT_PR = _W + 'sectPr'
+_HYPERLINK = _W + 'hyperlink'
+_VAL = _W + 'val'
+
+_PICTURE_URI = "http://schemas.openxmlformats.org/drawingml/2006/picture"
+_CHART_URI = "http://schemas.openxmlformats.org/drawingml/2006/chart"
+
+# run content elements that contribute characters to run.text
+_RUN_TEXT = {
+    _W + 't': None,
+    _W + 'tab': '\t',
+    _W + 'br': '\n',
+    _W + 'cr': '\n',
+    _W + 'noBreakHyphen': '-',
+}
+
+
+class RunRecord(object):
+    """Lightweight counterpart of docx.text.run.Run."""
+
+    __slots__ = ('text', 'font', 'style')
+
+    def __init__(self, r, styles):
+        rpr = r.find('w:rPr', _namespaces)
+        self.font = FontRecord(rpr)
+        self.style = None
+        if rpr is not None:
+            r_style = rpr.find('w:rStyle', _namespaces)
+            if r_style is not None:
+                self.style = styles.get(r_style.get(_VAL))
+        self.text = _run_text(r)
+
+    @property
+    def bold(self):
+        return self.font.bold
+
+    @bold.setter
+    def bold(self, value):
+        self.font.bold = value
+
+    @property
+    def italic(self):
+        return self.font.italic
+
+    @italic.setter
+    def italic(self, value):
+        self.font.italic = value
+
+    @property
+    def underline(self):
+        return self.font.underline
+
+    @underline.setter
+    def underline(self, value):
+        self.font.underline = value
+
+
+class ParagraphRecord(object):
+    """Lightweight counterpart of docx.text.paragraph.Paragraph."""
+
+    __slots__ = ('text', 'runs', 'style', 'paragraph_format')
+
+    def __init__(self, p, styles, default_style):
+        ppr = p.find('w:pPr', _namespaces)
+        self.paragraph_format = ParagraphFormatRecord(ppr)
+        self.style = default_style
+        if ppr is not None:
+            p_style = ppr.find('w:pStyle', _namespaces)
+            if p_style is not None:
+                self.style = styles.get(p_style.get(_VAL), default_style)
+        self.runs = [RunRecord(r, styles) for r in p.iterchildren(_R)]
+        parts = []
+        for child in p.iterchildren(_R, _HYPERLINK):
+            if child.tag == _R:
+                parts.append(_run_text(child))
+            else:
+                parts.extend(_run_text(r) for r in child.iterchildren(_R))
+        self.text = ''.join(parts)
+
+
+class SectionRecord(object):
+    """Section properties read from a w:sectPr element."""
+
+    __slots__ = ('start_type',)
+
+    def __init__(self, sect_pr):
+        self.start_type = WD_SECTION_START.NEW_PAGE
+        start_type = sect_pr.find('w:type', _namespaces)
+        if start_type is not None:
+            try:
+                self.start_type = WD_SECTION_START.from_xml(start_type.get(_VAL))
+            except ValueError:
+                pass
+
+
+class InlineShapeRecord(object):
+    """Inline picture or chart found in the document body."""
+
+    __slots__ = ('type', 'width', 'height')
+
+    def __init__(self, inline):
+        extent = inline.find('wp:extent', _namespaces)
+        self.width = Emu(int(extent.get('cx', 0))) if extent is not None else Emu(0)
+        self.height = Emu(int(extent.get('cy', 0))) if extent is not None else Emu(0)
+        graphic_data = inline.find('a:graphic/a:graphicData', _namespaces)
+        uri = graphic_data.get('uri') if graphic_data is not None else None
+        if uri == _PICTURE_URI:
+            blip = graphic_data.find('.//a:blip', _namespaces)
+            if blip is not None and blip.get('{%s}embed' % _namespaces['r']) is None \
+                    and blip.get('{%s}link' % _namespaces['r']) is not None:
+                self.type = WD_INLINE_SHAPE.LINKED_PICTURE
+            else:
+                self.type = WD_INLINE_SHAPE.PICTURE
+        elif uri == _CHART_URI:
+            self.type = WD_INLINE_SHAPE.CHART
+        else:
+            self.type = WD_INLINE_SHAPE.NOT_IMPLEMENTED
+
+
+def _run_text(r):
+    parts = []
+    for child in r.iterchildren():
+        if child.tag in _RUN_TEXT:
+            parts.append(_RUN_TEXT[child.tag] or child.text or '')
+    return ''.join(parts)
+
+
+class StreamingDocumentWrapper(DocumentWrapper):
+    """Read-only wrapper that streams word/document.xml with lxml.
+
+    Paragraphs, runs, sections and inline shapes are yielded as lightweight
+    records exposing the attributes DesignValidator uses. Processed
+    elements are cleared so memory does not grow with document length.
+    Records are detached from the document, so fixes applied to them are
+    not saved: run DesignValidator with make_changes=False.
+    """
+
+    read_only = True
+
+    def __init__(self, source):
+        """
+        :param source: docx file path, bytes or binary file-like object
+        """
+        self._grayscale_images = set()
+        self._source = self._read_source(source)
+        with self._open_package() as archive:
+            self._style_table = StyleTable.from_archive(archive)
+        self._styles = self._style_table.styles
+        self._default_style = self._style_table.default_style
+        self._text_statistics = None
+        self._signatures = {}
+
+    def _iter_body_elements(self):
+        """Yield top-level w:p, w:tbl and w:sectPr elements of the body.
+
+        Every yielded element is cleared and dropped from the tree as soon
+        as the consumer asks for the next one.
+        """
+
+        with self._open_package() as archive:
+            with archive.open('word/document.xml') as stream:
+                for _, element in et.iterparse(stream, events=('end',),
+                                               tag=(_P, _TBL, _SECT_PR)):
+                    parent = element.getparent()
+                    if parent is None or parent.tag != _BODY:
+                        continue
+                    yield element
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+    def iter_paragraphs(self, styles=None):
+        """Get paragraphs of specific styles of a document.
+
+        :param styles: Paragraph styles (as a list of strings) that have
+                       to be fetched. None value implies all paragraphs
+        :type styles: list
+        """
+
+        for element in self._iter_body_elements():
+            if element.tag != _P:
+                continue
+            paragraph = ParagraphRecord(element, self._styles,
+                                        self._default_style)
+            if styles:
+                if paragraph.style is not None and paragraph.style.name in styles:
+                    yield paragraph
+            else:
+                yield paragraph
+
+    def iter_sections(self):
+        """Iterate over sections in docx document."""
+
+        for element in self._iter_body_elements():
+            if element.tag == _SECT_PR:
+                yield SectionRecord(element)
+            elif element.tag == _P:
+                sect_pr = element.find('w:pPr/w:sectPr', _namespaces)
+                if sect_pr is not None:
+                    yield SectionRecord(sect_pr)
+
+    def paragraph_style_id(self, paragraph):
+        """Get id of the paragraph style resolved while reading it."""
+
+        return getattr(paragraph.style, 'style_id', None)
+
+    def get_paragraph_attributes(self, paragraph, unit='cm'):
+        """Get attributes for specified paragraph."""
+
+        fetched_attributes = {}
+        for attr in ParagraphFormatRecord.__slots__:
+            fetched_attributes[attr] = self._convert_unit(
+                getattr(paragraph.paragraph_format, attr) or
+                self.find_paragraph_attribute(paragraph.style,
+                                              'paragraph_format',
+                                              attr),
+                unit)
+        return fetched_attributes
+
+    def get_images_shapes(self):
+        images = []
+        for element in self._iter_body_elements():
+            for inline in element.iterfind('.//wp:inline', _namespaces):
+                shape = InlineShapeRecord(inline)
+                if shape.type == WD_INLINE_SHAPE.PICTURE or shape.type == WD_INLINE_SHAPE.LINKED_PICTURE \
+                        or shape.type == WD_INLINE_SHAPE.CHART:
+                    images.append(shape)
+        return images
+
+    def get_tables(self):
+        """Iterate over top-level w:tbl elements.
+
+        Each table is a detached copy, so it stays valid after the stream
+        moves on.
+        """
+
+        for element in self._iter_body_elements():
+            if element.tag == _TBL:
+                yield copy.deepcopy(element)
+
+    def save_as(self, filepath):
+        raise NotImplementedError(f"{type(self).__name__} is read-only, "
+                                  f"use DocumentWrapper to save changes")
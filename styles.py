@@ -0,0 +1,302 @@
+__all__ = ['StyleTable']
+
+import posixpath
+
+import lxml.etree as et
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.shared import Pt, Twips
+
+_namespaces = {
+    'w': "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    'a': "http://schemas.openxmlformats.org/drawingml/2006/main",
+    'rel': "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_W = '{%s}' % _namespaces['w']
+_VAL = _W + 'val'
+_THEME_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/theme"
+
+_FALSE_VALUES = ('0', 'false', 'off')
+
+
+def _on_off(element):
+    """Convert w:b/w:i-like toggle element to True, False or None."""
+    if element is None:
+        return None
+    return element.get(_VAL, 'true').lower() not in _FALSE_VALUES
+
+
+def _int_attr(element, attr):
+    if element is None:
+        return None
+    value = element.get(_W + attr)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+class FontRecord(object):
+    """Character formatting read from a w:rPr element."""
+
+    __slots__ = ('name', 'theme_name', 'size', 'bold', 'italic', 'underline')
+
+    def __init__(self, rpr=None):
+        self.name = None
+        self.theme_name = None
+        self.size = None
+        self.bold = None
+        self.italic = None
+        self.underline = None
+        if rpr is None:
+            return
+        fonts = rpr.find('w:rFonts', _namespaces)
+        if fonts is not None:
+            self.name = fonts.get(_W + 'ascii')
+            self.theme_name = fonts.get(_W + 'asciiTheme')
+        half_points = _int_attr(rpr.find('w:sz', _namespaces), 'val')
+        if half_points is not None:
+            self.size = Pt(half_points / 2.0)
+        self.bold = _on_off(rpr.find('w:b', _namespaces))
+        self.italic = _on_off(rpr.find('w:i', _namespaces))
+        underline = rpr.find('w:u', _namespaces)
+        if underline is not None:
+            self.underline = underline.get(_VAL, 'single') != 'none'
+
+
+class ParagraphFormatRecord(object):
+    """Paragraph formatting read from a w:pPr element."""
+
+    __slots__ = ('alignment', 'line_spacing', 'space_before', 'space_after',
+                 'left_indent', 'right_indent', 'first_line_indent')
+
+    def __init__(self, ppr=None):
+        self.alignment = None
+        self.line_spacing = None
+        self.space_before = None
+        self.space_after = None
+        self.left_indent = None
+        self.right_indent = None
+        self.first_line_indent = None
+        if ppr is None:
+            return
+        jc = ppr.find('w:jc', _namespaces)
+        if jc is not None:
+            try:
+                self.alignment = WD_PARAGRAPH_ALIGNMENT.from_xml(jc.get(_VAL))
+            except ValueError:
+                pass
+        spacing = ppr.find('w:spacing', _namespaces)
+        line = _int_attr(spacing, 'line')
+        if line is not None:
+            if spacing.get(_W + 'lineRule', 'auto') == 'auto':
+                self.line_spacing = line / 240.0
+            else:
+                self.line_spacing = Twips(line)
+        before = _int_attr(spacing, 'before')
+        if before is not None:
+            self.space_before = Twips(before)
+        after = _int_attr(spacing, 'after')
+        if after is not None:
+            self.space_after = Twips(after)
+        ind = ppr.find('w:ind', _namespaces)
+        left = _int_attr(ind, 'left')
+        if left is None:
+            left = _int_attr(ind, 'start')
+        if left is not None:
+            self.left_indent = Twips(left)
+        right = _int_attr(ind, 'right')
+        if right is None:
+            right = _int_attr(ind, 'end')
+        if right is not None:
+            self.right_indent = Twips(right)
+        first_line = _int_attr(ind, 'firstLine')
+        hanging = _int_attr(ind, 'hanging')
+        if hanging is not None:
+            self.first_line_indent = Twips(-hanging)
+        elif first_line is not None:
+            self.first_line_indent = Twips(first_line)
+
+
+class StyleRecord(object):
+    """Style definition from styles.xml with a link to its base style."""
+
+    __slots__ = ('style_id', 'name', 'type', 'base_style', 'font',
+                 'paragraph_format')
+
+    def __init__(self, element):
+        self.style_id = element.get(_W + 'styleId')
+        self.type = element.get(_W + 'type', 'paragraph')
+        name = element.find('w:name', _namespaces)
+        self.name = name.get(_VAL) if name is not None else self.style_id
+        self.base_style = None
+        self.font = FontRecord(element.find('w:rPr', _namespaces))
+        self.paragraph_format = ParagraphFormatRecord(
+            element.find('w:pPr', _namespaces))
+
+
+def _theme_fonts(theme_xml):
+    """Map 'major'/'minor' to latin typefaces of the theme font scheme."""
+    fonts = {}
+    if theme_xml is None:
+        return fonts
+    scheme = et.fromstring(theme_xml).find('.//a:fontScheme', _namespaces)
+    if scheme is None:
+        return fonts
+    for kind in ('major', 'minor'):
+        latin = scheme.find(f'a:{kind}Font/a:latin', _namespaces)
+        if latin is not None and latin.get('typeface'):
+            fonts[kind] = latin.get('typeface')
+    return fonts
+
+
+def _theme_part_name(archive):
+    try:
+        rels = et.fromstring(archive.read('word/_rels/document.xml.rels'))
+    except KeyError:
+        return None
+    for rel in rels.iterfind('rel:Relationship', _namespaces):
+        if rel.get('Type') == _THEME_REL_TYPE:
+            return posixpath.normpath(posixpath.join('word', rel.get('Target')))
+    return None
+
+
+class StyleTable(object):
+    """Flattened effective formatting of every style in styles.xml.
+
+    Inheritance through w:basedOn, w:docDefaults and theme fonts is resolved
+    once per document, so any style attribute is a single dict lookup.
+    """
+
+    _font_attributes = ('name', 'size', 'bold', 'italic', 'underline')
+
+    def __init__(self, styles_xml=None, theme_xml=None):
+        """
+        :param styles_xml: content of word/styles.xml
+        :param theme_xml: content of the theme part for theme fonts
+        """
+        self.styles = {}
+        self.default_style = None
+        self._theme_fonts = _theme_fonts(theme_xml)
+        self._table = {}
+        # attributes set by styles and their base styles, without defaults
+        self._own = {}
+        self._defaults = {}
+        if styles_xml is None:
+            return
+        root = et.fromstring(styles_xml)
+        self._defaults = self._flatten_record(
+            FontRecord(root.find('w:docDefaults/w:rPrDefault/w:rPr', _namespaces)),
+            ParagraphFormatRecord(root.find('w:docDefaults/w:pPrDefault/w:pPr', _namespaces)),
+            {})
+        elements = root.findall('w:style', _namespaces)
+        for element in elements:
+            style = StyleRecord(element)
+            self.styles[style.style_id] = style
+            if style.type == 'paragraph' and \
+                    element.get(_W + 'default') in ('1', 'true', 'on'):
+                self.default_style = style
+        for element in elements:
+            based_on = element.find('w:basedOn', _namespaces)
+            if based_on is not None:
+                style = self.styles[element.get(_W + 'styleId')]
+                style.base_style = self.styles.get(based_on.get(_VAL))
+        for style_id in self.styles:
+            self._resolve(style_id, set())
+
+    @classmethod
+    def from_archive(cls, archive):
+        """Build the table from an opened docx zipfile.ZipFile."""
+        names = set(archive.namelist())
+        if 'word/styles.xml' not in names:
+            return cls()
+        theme_name = _theme_part_name(archive)
+        theme_xml = archive.read(theme_name) if theme_name in names else None
+        return cls(archive.read('word/styles.xml'), theme_xml)
+
+    def _flatten_record(self, font, paragraph_format, inherited):
+        values = dict(inherited)
+        for attr in self._font_attributes:
+            value = getattr(font, attr)
+            if attr == 'name' and font.theme_name:
+                value = self._theme_fonts.get(font.theme_name[:5], value)
+            if value is not None:
+                values[('font', attr)] = value
+        for attr in ParagraphFormatRecord.__slots__:
+            value = getattr(paragraph_format, attr)
+            if value is not None:
+                values[('paragraph_format', attr)] = value
+        return values
+
+    def _resolve(self, style_id, resolving):
+        if style_id in self._own:
+            return self._own[style_id]
+        style = self.styles[style_id]
+        inherited = {}
+        # basedOn cycles are invalid but do occur in damaged documents
+        resolving.add(style_id)
+        if style.base_style is not None and style.base_style.style_id not in resolving:
+            inherited = self._resolve(style.base_style.style_id, resolving)
+        own = self._flatten_record(style.font, style.paragraph_format, inherited)
+        self._own[style_id] = own
+        values = dict(self._defaults)
+        values.update(own)
+        self._table[style_id] = values
+        return own
+
+    def resolve(self, style_id):
+        """Get all effective attributes of a style as {(element, attr): value}.
+
+        Unknown or None style_id gives the document defaults.
+        """
+        return self._table.get(style_id, self._defaults)
+
+    @classmethod
+    def tracks(cls, p_element, attr):
+        """Check that the table resolves attr of p_element, other attributes
+        are always None in it."""
+        if p_element == 'font':
+            return attr in cls._font_attributes
+        return p_element == 'paragraph_format' and attr in ParagraphFormatRecord.__slots__
+
+    def get(self, style_id, p_element, attr):
+        """Get effective attribute, e.g. get('Heading1', 'font', 'size')."""
+        return self._table.get(style_id, self._defaults).get((p_element, attr))
+
+    def resolve_own(self, style_id):
+        """Get attributes set by a style and its base styles, without the
+        document defaults, e.g. to put a table style between them.
+
+        Unknown or None style_id gives {}.
+        """
+        return self._own.get(style_id, {})
+
+    def get_own(self, style_id, p_element, attr):
+        """Get attribute set by a style or its base styles, None if only
+        the document defaults set it."""
+        return self._own.get(style_id, {}).get((p_element, attr))
+
+
+class RunSignature(object):
+    """Effective formatting shared by all runs that look the same.
+
+    Signatures are interned by DocumentWrapper.run_signatures, so equal
+    formatting is the same object and checks can cache verdicts per
+    signature. name and size (in pt) are resolved through the paragraph
+    style, bold, italic and underline are the run's direct formatting.
+    """
+
+    __slots__ = ('style_id', 'name', 'size', 'bold', 'italic', 'underline')
+
+    def __init__(self, style_id, name, size, bold, italic, underline):
+        self.style_id = style_id
+        self.name = name
+        self.size = size
+        self.bold = bold
+        self.italic = italic
+        self.underline = underline
+
+    def __repr__(self):
+        return (f"RunSignature({self.style_id}, {self.name}, {self.size}, "
+                f"bold={self.bold}, italic={self.italic}, underline={self.underline})")
@@ -0,0 +1,174 @@
+__all__ = ['TableRecord', 'ValueUsage']
+
+import lxml.etree as et
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.shared import Twips
+
+_namespaces = {'w': "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
+_W = '{%s}' % _namespaces['w']
+_VAL = _W + 'val'
+_TBL = _W + 'tbl'
+_TR = _W + 'tr'
+_TC = _W + 'tc'
+_P = _W + 'p'
+_R = _W + 'r'
+
+
+def _child_val(element, path):
+    if element is None:
+        return None
+    child = element.find(path, _namespaces)
+    if child is None:
+        return None
+    return child.get(_VAL)
+
+
+def _int(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class ValueUsage(object):
+    """How often a formatting value occurs in a table and where first."""
+
+    __slots__ = ('count', 'cell', 'elements')
+
+    def __init__(self, cell):
+        self.count = 0
+        # (row, column) in grid columns of the first cell with the value
+        self.cell = cell
+        # w:r or w:p elements with the value, if they are collected
+        self.elements = []
+
+
+class TableRecord(object):
+    """Effective formatting of a w:tbl element read in one sweep.
+
+    Rows and cells are walked in document order keeping the current grid
+    column, so merged cells (w:gridSpan, w:vMerge) are handled without
+    building a cell grid, unlike python-docx table.rows and table.cell().
+    Formatting is resolved as direct formatting, then run style, then
+    paragraph style, then table style and finally document defaults.
+    """
+
+    def __init__(self, tbl, style_table, collect_elements=False):
+        """
+        :param tbl: w:tbl element
+        :param style_table: styles.StyleTable of the document
+        :param collect_elements: keep runs and paragraphs of every value in
+                                 ValueUsage.elements, e.g. to fix them
+        """
+        self.rows = 0
+        self.cells = 0
+        tbl_pr = tbl.find('w:tblPr', _namespaces)
+        table_style = _child_val(tbl_pr, 'w:tblStyle')
+        grid = [_int(col.get(_W + 'w'), 0) for col in tbl.iterfind('w:tblGrid/w:gridCol', _namespaces)]
+        self.columns = len(grid)
+        self.width = self._width(tbl_pr, grid)
+        # {size in pt: ValueUsage}, {WD_PARAGRAPH_ALIGNMENT: ValueUsage}
+        self.font_sizes = {}
+        self.alignments = {}
+
+        table_values = style_table.resolve_own(table_style)
+        resolved = {}
+
+        def style_value(style_id, attr):
+            # paragraph style chain, then table style, then docDefaults
+            key = (style_id, attr)
+            if key not in resolved:
+                value = None
+                if style_id in style_table.styles:
+                    value = style_table.get_own(style_id, *attr)
+                elif style_table.default_style is not None:
+                    value = style_table.get_own(style_table.default_style.style_id, *attr)
+                if value is None:
+                    value = table_values.get(attr)
+                if value is None:
+                    value = style_table.get(None, *attr)
+                resolved[key] = value
+            return resolved[key]
+
+        depth = 0
+        row = -1
+        column = 0
+        spans = []
+        cell = None
+        merged = False
+        p_style = None
+        for event, element in et.iterwalk(tbl, events=('start', 'end'), tag=(_TBL, _TR, _TC, _P, _R)):
+            tag = element.tag
+            if tag == _TBL:
+                depth += 1 if event == 'start' else -1
+            elif tag == _TR:
+                if depth == 1 and event == 'start':
+                    row += 1
+                    self.rows += 1
+                    column = _int(_child_val(element, 'w:trPr/w:gridBefore'), 0)
+            elif tag == _TC:
+                if depth != 1:
+                    continue
+                if event == 'start':
+                    tc_pr = element.find('w:tcPr', _namespaces)
+                    spans.append(_int(_child_val(tc_pr, 'w:gridSpan'), 1))
+                    v_merge = tc_pr.find('w:vMerge', _namespaces) if tc_pr is not None else None
+                    # continuation of a vertically merged cell, content is above
+                    merged = v_merge is not None and v_merge.get(_VAL, 'continue') == 'continue'
+                    if not merged:
+                        self.cells += 1
+                    cell = (row, column)
+                else:
+                    column += spans.pop()
+                    merged = False
+            elif event == 'end' or merged:
+                continue
+            elif tag == _P:
+                ppr = element.find('w:pPr', _namespaces)
+                p_style = _child_val(ppr, 'w:pStyle')
+                alignment = None
+                jc = _child_val(ppr, 'w:jc')
+                if jc is not None:
+                    try:
+                        alignment = WD_PARAGRAPH_ALIGNMENT.from_xml(jc)
+                    except ValueError:
+                        pass
+                if alignment is None:
+                    alignment = style_value(p_style, ('paragraph_format', 'alignment'))
+                if alignment is None:
+                    alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
+                self._use(self.alignments, alignment, cell, element, collect_elements)
+            else:
+                rpr = element.find('w:rPr', _namespaces)
+                half_points = _int(_child_val(rpr, 'w:sz'))
+                if half_points is not None:
+                    size = half_points / 2.0
+                else:
+                    size = None
+                    r_style = _child_val(rpr, 'w:rStyle')
+                    if r_style in style_table.styles:
+                        size = style_table.get_own(r_style, 'font', 'size')
+                    if size is None:
+                        size = style_value(p_style, ('font', 'size'))
+                    size = getattr(size, 'pt', size)
+                self._use(self.font_sizes, size, cell, element, collect_elements)
+
+    @staticmethod
+    def _width(tbl_pr, grid):
+        tbl_w = tbl_pr.find('w:tblW', _namespaces) if tbl_pr is not None else None
+        if tbl_w is not None and tbl_w.get(_W + 'type') == 'dxa':
+            width = _int(tbl_w.get(_W + 'w'))
+            if width:
+                return Twips(width)
+        if grid:
+            return Twips(sum(grid))
+        return None
+
+    @staticmethod
+    def _use(usages, value, cell, element, collect_elements):
+        usage = usages.get(value)
+        if usage is None:
+            usage = usages[value] = ValueUsage(cell)
+        usage.count += 1
+        if collect_elements:
+            usage.elements.append(element)
@@ -0,0 +1,70 @@
+__all__ = ['TextStatistics']
+
+import re
+from array import array
+from itertools import accumulate
+
+_WORD = re.compile(r'\w+')
+
+
+class TextStatistics(object):
+    """Word and symbol counts of every paragraph computed in one pass.
+
+    Counts are kept in per-paragraph arrays with prefix sums, so the count
+    for the whole document or any paragraph range is O(1). A paragraph
+    changed by a fix is recounted alone with update().
+    """
+
+    kinds = ('words', 'symbols_with_spaces', 'symbols_without_spaces')
+
+    def __init__(self, texts=()):
+        """
+        :param texts: paragraph texts in document order
+        """
+        self._counts = {kind: array('l') for kind in self.kinds}
+        self._prefix = None
+        for text in texts:
+            self.append(text)
+
+    @staticmethod
+    def count_text(text):
+        """Get (words, symbols with spaces, symbols without spaces) of text."""
+        newlines = text.count('\n')
+        with_spaces = len(text) - newlines
+        return (len(_WORD.findall(text)),
+                with_spaces,
+                with_spaces - text.count(' ') - text.count('\t'))
+
+    def __len__(self):
+        return len(self._counts['words'])
+
+    def append(self, text):
+        """Count the next paragraph."""
+        for kind, value in zip(self.kinds, self.count_text(text)):
+            self._counts[kind].append(value)
+        self._prefix = None
+
+    def update(self, i, text):
+        """Recount paragraph i after its text was changed."""
+        for kind, value in zip(self.kinds, self.count_text(text)):
+            if self._counts[kind][i] != value:
+                self._counts[kind][i] = value
+                self._prefix = None
+
+    def paragraph(self, kind, i):
+        return self._counts[kind][i]
+
+    def count(self, kind, start=0, end=None):
+        """Get count of kind for paragraphs in range [start, end).
+
+        :param kind: one of TextStatistics.kinds
+        """
+        if self._prefix is None:
+            self._prefix = {k: array('l', accumulate(self._counts[k], initial=0))
+                            for k in self.kinds}
+        prefix = self._prefix[kind]
+        if end is None or end > len(self):
+            end = len(self)
+        if start >= end:
+            return 0
+        return prefix[end] - prefix[start]
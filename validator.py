@@ -1,245 +1,578 @@
-__all__ = ['DesignValidator']
+__all__ = ['DesignValidator', 'StructureValidator', 'RequirementsPlan', 'ParagraphView', 'RESULT_PATH']
 
-import re
+import copy
+import io
 import jsonschema
 from docx.enum.section import WD_SECTION_START
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.shared import Pt, Cm
-from chardet import detect
+from captions import CaptionIndex
+from errors import ErrorFormat, ErrorStore
+from frontmatter import FRONT_MATTER_LIMIT, FrontMatter
+from language import CYRILLIC, LATIN, classify_words
+from profiling import CheckProfiler
+from sections import SectionIndex
+from literature import Bibliography
+from tables import TableRecord
 from schema import RequirementsSchema
+from textstats import TextStatistics
 
 
-class DesignValidator(object):
-    """Class for validating docx document."""
+_FONTS_NORMAL = ["Times New Roman", "Arial", "Cambria", "Calibri"]
+_INTERVALS_NORMAL = [1.0, 1.15, 1.5, 2.0, 2.5, 3.0, 1, 2, 3]
+# validate_* phases fused into one paragraph traversal by validate()
+_PARAGRAPH_PHASES = {
+    'validate_general_requirements': '_general',
+    'validate_images_requirements': '_images',
+    'validate_tables_requirements': '_tables',
+    'validate_literature': '_literature'
+}
+# where result() saves the fixed document by default
+RESULT_PATH = "out/_result.docx"
+_PHASE_NAMES = {prefix: phase for phase, prefix in _PARAGRAPH_PHASES.items()}
+# checks processing runs count them as items in the profile
+_RUN_CHECKS = ('_check_font', '_check_styles_allowed')
+_ALIGNMENTS = {
+    "justify": WD_PARAGRAPH_ALIGNMENT.JUSTIFY,
+    "center": WD_PARAGRAPH_ALIGNMENT.CENTER,
+    "left": WD_PARAGRAPH_ALIGNMENT.LEFT,
+    "right": WD_PARAGRAPH_ALIGNMENT.RIGHT
+}
 
-    def __init__(self, wrapper, requirements):
+
+_ERRORS_SKELETON = {
+    "requirements": [],
+    "general": {
+        "font": [],
+        "font_size": [],
+        "interval": [],
+        "alignment": [],
+        "columns": [],
+        "italic_allowed": [],
+        "bold_allowed": [],
+        "underlined_allowed": [],
+        "double_space_allowed": [],
+        "size_min": [],
+        "size_max": []
+    },
+    "images": {
+        "num_min": [],
+        "num_max": [],
+        "width_max": [],
+        "dpi_min": [],
+        "color_allowed": [],
+        "links_required": []
+    },
+    "tables": {
+        "font_size": [],
+        "alignment": [],
+        "width_max": [],
+        "links_required": []
+    },
+    "keywords": {
+        "required": [],
+        "num_min": [],
+        "num_max": [],
+        "english": []
+    },
+    "UDC": [],
+    "literature": {
+        "num_min": [],
+        "num_max": [],
+        "DOI_required": [],
+        "self-citation_part": [],
+        "foreign_part_min": [],
+        "foreign_part_max": [],
+        "novelty_settings": [],
+        "antiquity_settings": []
+    }
+}
+_PARAGRAPH_KEYS = ("paragraph", None, "expected", "found")
+_RUN_KEYS = ("paragraph", "run", "expected", "found")
+_ERROR_FORMATS = {
+    "general.font": ErrorFormat(("general", "font"),
+                                "FontName: paragraph {location}, expected {expected}, found {found}",
+                                _PARAGRAPH_KEYS),
+    "general.font_size": ErrorFormat(("general", "font_size"),
+                                     "Font Size: paragraph {location}, expected {expected}, found {found}",
+                                     _PARAGRAPH_KEYS),
+    "general.interval": ErrorFormat(("general", "interval"),
+                                    "Interval: paragraph {location}, expected {expected}, found {found}",
+                                    _PARAGRAPH_KEYS),
+    "general.alignment": ErrorFormat(("general", "alignment"),
+                                     "Alignment: paragraph {location}, expected {expected}, found {found}",
+                                     _PARAGRAPH_KEYS),
+    "general.columns": ErrorFormat(("general", "columns"),
+                                   "Columns: section {location}, expected {expected}, found {found}",
+                                   ("section", None, "expected", "found")),
+    "general.italic_allowed": ErrorFormat(("general", "italic_allowed"),
+                                          "Italic Allowed: paragraph {location}, expected {expected}, found {found}",
+                                          _RUN_KEYS),
+    "general.bold_allowed": ErrorFormat(("general", "bold_allowed"),
+                                        "Bold Allowed: paragraph {location}, expected {expected}, found {found}",
+                                        _RUN_KEYS),
+    "general.underlined_allowed": ErrorFormat(("general", "underlined_allowed"),
+                                              "Underlined Allowed: paragraph {location}, expected {expected}, "
+                                              "found {found}",
+                                              _RUN_KEYS),
+    "general.double_space_allowed": ErrorFormat(("general", "double_space_allowed"),
+                                                "Double Space Allowed: paragraph {location}, expected {expected}, "
+                                                "found {found}",
+                                                _PARAGRAPH_KEYS),
+    "general.size_min": ErrorFormat(("general", "size_min"),
+                                    "Size Min: expected {expected}, found {found}",
+                                    (None, None, "expected", "found")),
+    "general.size_max": ErrorFormat(("general", "size_max"),
+                                    "Size Max: expected {expected}, found {found}",
+                                    (None, None, "expected", "found")),
+    "requirements.images_num": ErrorFormat(("requirements",),
+                                           "Image Number: Minimal image number {expected} "
+                                           "is bigger than maximal number {found}",
+                                           "Minimal image number {expected} is bigger than maximal number {found}"),
+    "requirements.keywords_num": ErrorFormat(("requirements",),
+                                             "Keyword Number: Minimal keywords number {expected} "
+                                             "is bigger than maximal number {found}",
+                                             "Minimal keywords number {expected} is bigger than maximal number {found}"),
+    "images.num_min": ErrorFormat(("images", "num_min"),
+                                  "Min Num Images: Min {expected}, found {found}",
+                                  (None, None, "num_min", "found")),
+    "images.num_max": ErrorFormat(("images", "num_max"),
+                                  "Max Num Images: Max {expected}, found {found}",
+                                  (None, None, "num_max", "found")),
+    "images.width_max": ErrorFormat(("images", "width_max"),
+                                    "Images Max Width: image {location}, Max Width {expected}, found {found}",
+                                    ("image", None, "width_max", "found")),
+    "images.dpi_min": ErrorFormat(("images", "dpi_min"),
+                                  "Images Dpi Width: image {location}, Dpi Min {expected}, found {found}",
+                                  ("image", None, "dpi_min", "found")),
+    "images.color_allowed": ErrorFormat(("images", "color_allowed"),
+                                        "Images Color Allowed: image {location}, Allowed {expected}, found {found}",
+                                        ("image", None, "color_allowed", "found")),
+    "images.links_required": ErrorFormat(("images", "links_required"),
+                                         "Links Required: Image {found} defined in paragraph {location} haven't linked",
+                                         "Image {found} defined in paragraph {location} haven't linked"),
+    "tables.font_size": ErrorFormat(("tables", "font_size"),
+                                    "Table Font Size: table {location}, cell {run}, expected {expected}, found {found}",
+                                    ("table", "cell", "expected", "found"),
+                                    "Table Font Size: table {location}, expected {expected}, found {found}"),
+    "tables.alignment": ErrorFormat(("tables", "alignment"),
+                                    "Table Alignment: table {location}, cell {run}, expected {expected}, found {found}",
+                                    ("table", "cell", "expected", "found"),
+                                    "Table Alignment: table {location}, expected {expected}, found {found}"),
+    "tables.width_max": ErrorFormat(("tables", "width_max"),
+                                    "Tables Max Width: table {location}, Max Width {expected}, found {found}",
+                                    ("table", None, "width_max", "found")),
+    "tables.links_required": ErrorFormat(("tables", "links_required"),
+                                         "Links Required: Table {found} defined in paragraph {location} haven't linked",
+                                         "Table {found} defined in paragraph {location} haven't linked"),
+    "keywords.required": ErrorFormat(("keywords", "required"),
+                                     "Keyword Required: Required {expected}, found {found}",
+                                     (None, None, "required", "found")),
+    "keywords.num_min": ErrorFormat(("keywords", "num_min"),
+                                    "Keyword Min Num: Min Num {expected}, found {found}",
+                                    (None, None, "num_min", "found")),
+    "keywords.num_max": ErrorFormat(("keywords", "num_max"),
+                                    "Keyword Max Num: Max Num {expected}, found {found}",
+                                    (None, None, "num_max", "found")),
+    "keywords.english": ErrorFormat(("keywords", "english"),
+                                    "Keyword English: English {expected}, word {found}",
+                                    (None, None, "english", "found")),
+    "keywords.english_num": ErrorFormat(("keywords", "english"),
+                                        "Keyword English: English {expected}, eng_num {found[0]}, rus_num {found[1]}",
+                                        (None, None, "english", ("eng_num", "rus_num"))),
+    "literature.num_min": ErrorFormat(("literature", "num_min"),
+                                      "Literature Min Num: Min Num {expected}, found {found}",
+                                      (None, None, "num_min", "found")),
+    "literature.num_max": ErrorFormat(("literature", "num_max"),
+                                      "Literature Max Num: Max Num {expected}, found {found}",
+                                      (None, None, "num_max", "found")),
+    "literature.DOI_required": ErrorFormat(("literature", "DOI_required"),
+                                           "Literature DOI Required: reference {run} in paragraph {location} "
+                                           "has no DOI",
+                                           ("paragraph", "reference", "DOI_required", "found")),
+    "literature.self_citation_part": ErrorFormat(("literature", "self-citation_part"),
+                                                 "Literature Self-citation Part: Max {expected}, found {found:.2f}",
+                                                 (None, None, "self-citation_part", "found")),
+    "literature.foreign_part_min": ErrorFormat(("literature", "foreign_part_min"),
+                                               "Literature Foreign Part: Min {expected}, found {found:.2f}",
+                                               (None, None, "foreign_part_min", "found")),
+    "literature.foreign_part_max": ErrorFormat(("literature", "foreign_part_max"),
+                                               "Literature Foreign Part: Max {expected}, found {found:.2f}",
+                                               (None, None, "foreign_part_max", "found")),
+    "literature.novelty_settings": ErrorFormat(("literature", "novelty_settings"),
+                                               "Literature Novelty: since {expected[0]} expected number "
+                                               "{expected[1]}, part {expected[2]}, found {found[0]}, part {found[1]:.2f}",
+                                               (None, None, "novelty_settings", ("num", "part"))),
+    "literature.antiquity_settings": ErrorFormat(("literature", "antiquity_settings"),
+                                                 "Literature Antiquity: before {expected[0]} expected number "
+                                                 "{expected[1]}, part {expected[2]}, found {found[0]}, "
+                                                 "part {found[1]:.2f}",
+                                                 (None, None, "antiquity_settings", ("num", "part"))),
+    "UDC": ErrorFormat(("UDC",),
+                       "UDC: not found but required",
+                       "UDC not found but required")
+}
+
+# sections with "required" and optional "size_min", "size_max" requirements
+_STRUCTURE_SECTIONS = ('annotation', 'introduction', 'purpose', 'materials_methods', 'results', 'significance',
+                       'discussion', 'conclusion', 'financing', 'gratitude')
+_STRUCTURE_ERRORS_SKELETON = {name: {"required": [], "size_min": [], "size_max": []}
+                              for name in _STRUCTURE_SECTIONS}
+_STRUCTURE_ERROR_FORMATS = {}
+for _name in _STRUCTURE_SECTIONS:
+    _STRUCTURE_ERROR_FORMATS.update({
+        _name + ".required": ErrorFormat((_name, "required"),
+                                         f"Section Required: {_name}, expected {{expected}}, found {{found}}",
+                                         (None, None, "required", "found")),
+        _name + ".size_min": ErrorFormat((_name, "size_min"),
+                                         f"Section Size Min: {_name} in paragraph {{location}}, "
+                                         f"expected {{expected}}, found {{found}}",
+                                         ("paragraph", None, "expected", "found")),
+        _name + ".size_max": ErrorFormat((_name, "size_max"),
+                                         f"Section Size Max: {_name} in paragraph {{location}}, "
+                                         f"expected {{expected}}, found {{found}}",
+                                         ("paragraph", None, "expected", "found"))
+    })
+del _name
+
+
+class RequirementsPlan(object):
+    """Requirements validated and compiled once for many documents.
+
+    Only enabled checks are kept (null requirements are dropped), values
+    the checks compare against are pre-extracted and enum values like
+    alignment are resolved. The plan is immutable, pass it to
+    DesignValidator instead of the requirements json to skip schema
+    validation and setup for every document.
+    """
+
+    def __init__(self, requirements):
         """
-        :param wrapper: Wrapper
         :param requirements: json
         """
-        # requirements - JSON
-        # requirements_schema returns schema
         try:
             jsonschema.validate(instance=requirements, schema=RequirementsSchema().requirements_schema)
         except jsonschema.exceptions.ValidationError as err:
             print(f"Requirements file invalid: {err.message}")
+        values = {"requirements": copy.deepcopy(requirements)}
+        general = values["requirements"]['general']
+
+        values["font"] = general['font']
+        values["font_settable"] = general['font'] in _FONTS_NORMAL
+        values["font_size"] = general['font_size']
+        values["font_size_pt"] = Pt(general['font_size']) if general['font_size'] is not None else None
+        values["font_size_settable"] = general['font_size'] is not None and 5 < general['font_size'] < 50
+        values["interval"] = general['interval']
+        values["interval_settable"] = general['interval'] in _INTERVALS_NORMAL
+        values["alignment"] = general['alignment']
+        values["alignment_value"] = _ALIGNMENTS.get(general['alignment'])
+        values["alignment_lower"] = general['alignment'].lower() if general['alignment'] is not None else None
+        values["italic_forbidden"] = general['italic_allowed'] is False
+        values["bold_forbidden"] = general['bold_allowed'] is False
+        values["underlined_forbidden"] = general['underlined_allowed'] is False
+
+        paragraph_checks = []
+        if general['font'] is not None or general['font_size'] is not None:
+            paragraph_checks.append('_check_font')
+        if general['interval'] is not None:
+            paragraph_checks.append('_check_interval')
+        if general['alignment'] is not None:
+            paragraph_checks.append('_check_alignment')
+        if values["italic_forbidden"] or values["bold_forbidden"] or values["underlined_forbidden"]:
+            paragraph_checks.append('_check_styles_allowed')
+        if general['double_space_allowed'] is False:
+            paragraph_checks.append('_check_spaces')
+        values["paragraph_checks"] = tuple(paragraph_checks)
+        values["columns_check"] = general['columns'] is not None
+        values["size_check"] = general['size_min'] is not None or general['size_max'] is not None
+
+        phases = []
+        if paragraph_checks or values["columns_check"] or values["size_check"]:
+            phases.append('validate_general_requirements')
+        if any(value is not None for value in values["requirements"]['images'].values()):
+            phases.append('validate_images_requirements')
+        if any(value is not None for value in values["requirements"]['tables'].values()):
+            phases.append('validate_tables_requirements')
+        if any(value is not None for value in values["requirements"]['keywords'].values()):
+            phases.append('validate_keywords')
+        if values["requirements"]['UDC']['required']:
+            phases.append('validate_udc')
+        literature = values["requirements"].get('literature', {})
+        if any(value is not None for name, value in literature.items() if name != 'style'):
+            phases.append('validate_literature')
+        values["phases"] = tuple(phases)
+
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def validator(self, wrapper, make_changes=True, profile=False, front_matter_limit=FRONT_MATTER_LIMIT):
+        """Get DesignValidator running this plan against wrapper."""
+        return DesignValidator(wrapper, self, make_changes, profile, front_matter_limit)
+
+
+class ParagraphView(object):
+    """Paragraph with text, lowercase text and runs materialized once.
+
+    Stands in for the paragraph in all fused paragraph-level checks.
+    Setting text writes through to the paragraph and refreshes the cache.
+    """
+
+    __slots__ = ('index', 'paragraph', '_text', '_lower', '_runs', 'signatures')
+
+    def __init__(self, index, paragraph):
+        self.index = index
+        self.paragraph = paragraph
+        self._text = paragraph.text
+        self._lower = None
+        self._runs = None
+        # run signatures shared by the run checks, set by the first of them
+        self.signatures = None
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self.paragraph.text = value
+        self._text = self.paragraph.text
+        self._lower = None
+        self._runs = None
+        self.signatures = None
+
+    @property
+    def lower(self):
+        if self._lower is None:
+            self._lower = self._text.lower()
+        return self._lower
+
+    @property
+    def runs(self):
+        if self._runs is None:
+            self._runs = self.paragraph.runs
+        return self._runs
+
+    @property
+    def style(self):
+        return self.paragraph.style
+
+    @property
+    def paragraph_format(self):
+        return self.paragraph.paragraph_format
+
+
+class DesignValidator(object):
+    """Class for validating docx document."""
+
+    def __init__(self, wrapper, requirements, make_changes=True, profile=False,
+                 front_matter_limit=FRONT_MATTER_LIMIT):
+        """
+        :param wrapper: Wrapper
+        :param requirements: json or RequirementsPlan compiled from it
+        :param make_changes: fix found errors in the document, must be False
+                             for read-only wrappers like StreamingDocumentWrapper
+        :param profile: record time, calls and items of every check and phase
+        :param front_matter_limit: number of first paragraphs searched for
+                                   UDC, title, authors and keywords
+        """
+        if make_changes and getattr(wrapper, 'read_only', False):
+            raise ValueError(f"{type(wrapper).__name__} is read-only, "
+                             f"create the validator with make_changes=False")
+        if not isinstance(requirements, RequirementsPlan):
+            requirements = RequirementsPlan(requirements)
+        self._plan = requirements
         self._title_first_centered = True
-        self._make_changes = True
+        # one of TextStatistics.kinds, used for size_min and size_max
+        self._size_unit = "words"
+        self._make_changes = make_changes
+        self._profiler = CheckProfiler() if profile else None
+        self._front_matter_limit = front_matter_limit
+        self._front_matter = None
+        self.bibliography = None
+        # verdicts per interned RunSignature, evaluated once per formatting
+        self._font_verdicts = {}
+        self._styles_verdicts = {}
         self._log = []
         self._docx = wrapper
-        self._requirements = requirements
-        self._errors = {
-            "requirements": [],
-            "general": {
-                "font": [],
-                "font_size": [],
-                "interval": [],
-                "alignment": [],
-                "columns": [],
-                "italic_allowed": [],
-                "bold_allowed": [],
-                "underlined_allowed": [],
-                "double_space_allowed": [],
-                "size_min": [],
-                "size_max": []
-            },
+        self._requirements = requirements.requirements
+        self._errors = ErrorStore(_ERROR_FORMATS, _ERRORS_SKELETON)
+        self._warnings = {
             "images": {
-                "num_min": [],
-                "num_max": [],
-                "width_max": [],
-                "dpi_min": [],
-                "color_allowed": [],
-                "links_required": []
+                "links": []
             },
             "tables": {
-                "font_size": [],
-                "alignment": [],
-                "width_max": [],
-                "links_required": []
-            },
-            "keywords": {
-                "required": [],
-                "num_min": [],
-                "num_max": [],
-                "english": []
-            },
-            "UDC": []
-        }
-        self._warnings = {
-            "images": {
                 "links": []
             }
         }
-        self.errors_list = []
         self.warnings_list = []
 
+    @property
+    def errors_list(self):
+        """Human readable messages of all errors, rendered on each call."""
+        return self._errors.messages()
+
+    @property
+    def errors_num(self):
+        return len(self._errors)
+
+    @property
+    def profile(self):
+        """Time, calls and items per check and phase, None if profiling is disabled.
+
+        Phase time includes its paragraph checks, items of paragraph checks
+        are paragraphs, or runs for font and styles checks.
+        """
+        if self._profiler is None:
+            return None
+        return self._profiler.to_json()
+
+    def dump_profile(self, file):
+        """Write profile as JSON to a path or a text file-like object."""
+        if self._profiler is None:
+            raise ValueError(f"{type(self).__name__} was created without profile=True, "
+                             "there is no profile to dump")
+        self._profiler.dump(file)
+
+    def _run_signatures(self, paragraph, runs):
+        if not isinstance(paragraph, ParagraphView):
+            return self._docx.run_signatures(paragraph, runs)
+        # computed once per paragraph, font fixes don't touch bold, italic
+        # and underline read by _check_styles_allowed after _check_font
+        if paragraph.signatures is None:
+            paragraph.signatures = self._docx.run_signatures(paragraph.paragraph, runs)
+        return paragraph.signatures
+
     def _check_font(self, paragraph, p_i=None):
-        if self._requirements['general']['font'] is None and \
-                self._requirements['general']['font_size'] is None:
-            return
+        plan = self._plan
         name_changes = 0
         size_changes = 0
-        for j, run in enumerate(paragraph.runs):
-            # print(run.text)
-            name = (run.font.name or self._docx.find_paragraph_attribute(paragraph.style, 'font', 'name'))
-            size = (getattr(run.font.size, 'pt', self._requirements['general']['font_size']) or \
-                    self._docx.find_paragraph_attribute(paragraph.style, 'font', 'size').pt)
+        runs = paragraph.runs
+        signatures = self._run_signatures(paragraph, runs)
+        for j, run in enumerate(runs):
+            signature = signatures[j]
+            verdict = self._font_verdicts.get(signature)
+            if verdict is None:
+                verdict = (plan.font is not None and signature.name != plan.font,
+                           plan.font_size is not None and signature.size != plan.font_size)
+                self._font_verdicts[signature] = verdict
+            wrong_name, wrong_size = verdict
+            if not wrong_name and not wrong_size:
+                continue
+            name = signature.name
+            size = signature.size
             if not self._make_changes:
                 name_ok = True
                 size_ok = True
-                if self._requirements['general']['font'] is not None and \
-                        name != self._requirements['general']['font'] and name_ok:
-                    self.errors_list.append(f"FontName: paragraph {p_i}, expected {self._requirements['general']['font']}, found {name}")
-                    self._errors['general']['font'].append({"paragraph": p_i,
-                                                            "expected": self._requirements['general']['font'],
-                                                            "found": name
-                                                            })
+                if wrong_name and name_ok:
+                    self._errors.add("general.font", p_i, expected=plan.font, found=name)
                     name_ok = False
-                if self._requirements['general']['font_size'] is not None and \
-                        size != self._requirements['general']['font_size'] and size_ok:
-                    self.errors_list.append(f"Font Size: paragraph {p_i}, expected {self._requirements['general']['font_size']}, found {size}")
-                    self._errors['general']['font_size'].append({"paragraph": p_i,
-                                                                 "expected": self._requirements['general']['font_size'],
-                                                                 "found": size
-                                                                 })
+                if wrong_size and size_ok:
+                    self._errors.add("general.font_size", p_i, expected=plan.font_size, found=size)
                     size_ok = False
                 if not name_ok and not size_ok:
                     break
             else:
-                if self._requirements['general']['font'] is not None and \
-                        name != self._requirements['general']['font']:
-                    self.errors_list.append(f"FontName: paragraph {p_i}, expected {self._requirements['general']['font']}, found {name}")
-                    self._errors['general']['font'].append({"paragraph": p_i,
-                                                            "expected": self._requirements['general']['font'],
-                                                            "found": name
-                                                            })
-                    if self._requirements['general']['font'] in ["Times New Roman", "Arial", "Cambria", "Calibri"]:
-                        run.font.name = self._requirements['general']['font']
+                if wrong_name:
+                    self._errors.add("general.font", p_i, expected=plan.font, found=name)
+                    if plan.font_settable:
+                        run.font.name = plan.font
                         name_changes += 1
                     else:
                         self._log.append(f"Error while set font name in paragraph {p_i}: "
-                                         f"{self._requirements['general']['font']} "
-                                         f"is out of normal {['Times New Roman', 'Arial', 'Cambria', 'Calibri']}")
-                if self._requirements['general']['font_size'] is not None and \
-                        size != self._requirements['general']['font_size']:
-                    self.errors_list.append(f"Font Size: paragraph {p_i}, expected {self._requirements['general']['font_size']}, found {size}")
-                    self._errors['general']['font_size'].append({"paragraph": p_i,
-                                                                 "expected": self._requirements['general']['font_size'],
-                                                                 "found": size
-                                                                 })
-                    if 5 < self._requirements['general']['font_size'] < 50:
-                        run.font.size = Pt(self._requirements['general']['font_size'])
+                                         f"{plan.font} "
+                                         f"is out of normal {_FONTS_NORMAL}")
+                if wrong_size:
+                    self._errors.add("general.font_size", p_i, expected=plan.font_size, found=size)
+                    if plan.font_size_settable:
+                        run.font.size = plan.font_size_pt
                         size_changes += 1
                     else:
                         self._log.append(f"Error while set font size in paragraph {p_i}: "
-                                         f"{self._requirements['general']['font_size']} "
+                                         f"{plan.font_size} "
                                          f"is out of normal {range(5, 40)}")
         if name_changes > 0:
             self._log.append(f"Change font name {name_changes} times in paragraph {p_i} "
-                             f"to {self._requirements['general']['font']}")
+                             f"to {plan.font}")
         if size_changes > 0:
             self._log.append(f"Change font size {size_changes} times in paragraph {p_i} "
-                             f"to {self._requirements['general']['font_size']}")
+                             f"to {plan.font_size}")
 
     def _check_interval(self, paragraph, p_i=None):
         """
         :param paragraph: docx.Document.paragraph
         :param p_i: paragraph index for logging
         """
+        expected = self._plan.interval
         interval = paragraph.paragraph_format.line_spacing
-        if interval != self._requirements['general']['interval']:
-            self.errors_list.append(
-                f"Interval: paragraph {p_i}, expected {self._requirements['general']['interval']}, found {interval}")
-            self._errors['general']['interval'].append({"paragraph": p_i,
-                                                        "expected": self._requirements['general']['interval'],
-                                                        "found": interval
-                                                        })
+        if interval != expected:
+            self._errors.add("general.interval", p_i, expected=expected, found=interval)
             if self._make_changes:
-                if self._requirements['general']['interval'] in [1.0, 1.15, 1.5, 2.0, 2.5, 3.0, 1, 2, 3]:
-                    paragraph.paragraph_format.line_spacing = self._requirements['general']['interval']
+                if self._plan.interval_settable:
+                    paragraph.paragraph_format.line_spacing = expected
                     self._log.append(f"Change of line_spacing of paragraph {p_i} from {interval} "
-                                     f"to {self._requirements['general']['interval']}")
+                                     f"to {expected}")
                 else:
                     self._log.append(f"Error while set line_spacing of paragraph {p_i}: "
-                                     f"{self._requirements['general']['interval']} "
-                                     f"is out of normal {[1.0, 1.15, 1.5, 2.0, 2.5, 3.0, 1, 2, 3]}")
+                                     f"{expected} "
+                                     f"is out of normal {_INTERVALS_NORMAL}")
 
     def _check_alignment(self, paragraph, p_i=None):
         """
         :param paragraph: docx.Document.paragraph
         :param p_i: paragraph index for logging
         """
+        expected = self._plan.alignment
         alignment = paragraph.paragraph_format.alignment
-        if not self._requirements['general']['alignment'].lower() in str(alignment).lower():
-            self.errors_list.append(
-                f"Alignment: paragraph {p_i}, expected {self._requirements['general']['alignment']}, found {alignment}")
-            self._errors['general']['alignment'].append({"paragraph": p_i,
-                                                         "expected": self._requirements['general']['alignment'],
-                                                         "found": alignment
-                                                         })
+        if not self._plan.alignment_lower in str(alignment).lower():
+            self._errors.add("general.alignment", p_i, expected=expected, found=alignment)
             if self._make_changes:
-                if self._requirements['general']['alignment'] in ["justify", "center", "left", "right"]:
-                    if self._requirements['general']['alignment'] == "justify":
-                        paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
-                    elif self._requirements['general']['alignment'] == "center":
-                        paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                    elif self._requirements['general']['alignment'] == "left":
-                        paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                    elif self._requirements['general']['alignment'] == "right":
-                        paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT
+                if self._plan.alignment_value is not None:
+                    paragraph.paragraph_format.alignment = self._plan.alignment_value
                     self._log.append(f"Change of alignment of paragraph {p_i} from {alignment} "
-                                     f"to {self._requirements['general']['alignment']}")
+                                     f"to {expected}")
                 else:
                     self._log.append(f"Error while set alignment of paragraph {p_i}: "
-                                     f"{self._requirements['general']['alignment']} "
-                                     f"is out of normal {['justify', 'center', 'left', 'right']}")
+                                     f"{expected} "
+                                     f"is out of normal {list(_ALIGNMENTS)}")
 
     # TODO _check_columns
     def _check_columns(self):
         pass
 
     def _check_styles_allowed(self, paragraph, p_i):
-        if self._requirements['general']['italic_allowed'] and \
-                self._requirements['general']['bold_allowed'] and \
-                self._requirements['general']['underlined_allowed']:
-            return
+        general = self._requirements['general']
+        italic_forbidden = self._plan.italic_forbidden
+        bold_forbidden = self._plan.bold_forbidden
+        underlined_forbidden = self._plan.underlined_forbidden
         italic_changes = 0
         bold_changes = 0
         underlined_changes = 0
-        for j, run in enumerate(paragraph.runs):
-            if run.italic and not self._requirements['general']['italic_allowed']:
-                self.errors_list.append(
-                f"Italic Allowed: paragraph {p_i}, expected {self._requirements['general']['italic_allowed']}, found True")
-                self._errors['general']['italic_allowed'].append({"paragraph": p_i,
-                                                                  "run": j,
-                                                                  "expected": self._requirements['general'][
-                                                                      'italic_allowed'],
-                                                                  "found": True
-                                                                  })
+        runs = paragraph.runs
+        signatures = self._run_signatures(paragraph, runs)
+        for j, run in enumerate(runs):
+            signature = signatures[j]
+            verdict = self._styles_verdicts.get(signature)
+            if verdict is None:
+                verdict = (italic_forbidden and bool(signature.italic),
+                           bold_forbidden and bool(signature.bold),
+                           underlined_forbidden and bool(signature.underline))
+                self._styles_verdicts[signature] = verdict
+            wrong_italic, wrong_bold, wrong_underline = verdict
+            if wrong_italic:
+                self._errors.add("general.italic_allowed", p_i, j, general['italic_allowed'], True)
                 if self._make_changes:
                     run.italic = False
                     italic_changes += 1
-            if run.bold and not self._requirements['general']['bold_allowed']:
-                self.errors_list.append(
-                f"Bold Allowed: paragraph {p_i}, expected {self._requirements['general']['bold_allowed']}, found True")
-                self._errors['general']['bold_allowed'].append({"paragraph": p_i,
-                                                                "run": j,
-                                                                "expected": self._requirements['general'][
-                                                                    'bold_allowed'],
-                                                                "found": True
-                                                                })
+            if wrong_bold:
+                self._errors.add("general.bold_allowed", p_i, j, general['bold_allowed'], True)
                 if self._make_changes:
                     run.bold = False
                     bold_changes += 1
-            if run.underline and not self._requirements['general']['underlined_allowed']:
-                self.errors_list.append(
-                f"Underlined Allowed: paragraph {p_i}, expected {self._requirements['general']['underlined_allowed']}, found True")
-                self._errors['general']['underlined_allowed'].append({"paragraph": p_i,
-                                                                      "run": j,
-                                                                      "expected": self._requirements['general'][
-                                                                          'underlined_allowed'],
-                                                                      "found": True
-                                                                      })
+            if wrong_underline:
+                self._errors.add("general.underlined_allowed", p_i, j, general['underlined_allowed'], True)
                 if self._make_changes:
                     run.underline = False
                     underlined_changes += 1
@@ -252,209 +585,212 @@ class DesignValidator(object):
 
     def _check_spaces(self, paragraph, p_i):
         text = paragraph.text
-        if self._requirements['general']['double_space_allowed'] is None:
-            return
-        if not self._requirements['general']['double_space_allowed']:
-            if "  " in text:
-                self.errors_list.append(
-                f"Double Space Allowed: paragraph {p_i}, expected {self._requirements['general']['double_space_allowed']}, found True")
-                self._errors['general']['double_space_allowed'].append({"paragraph": p_i,
-                                                                        "expected": self._requirements['general'][
-                                                                            'double_space_allowed'],
-                                                                        "found": True
-                                                                        })
-                if self._make_changes:
-                    paragraph.text = text.replace("  ", ' ')
-                    self._log.append(f"Removed double spaces in paragraph {p_i}")
+        if "  " in text:
+            self._errors.add("general.double_space_allowed", p_i, expected=False, found=True)
+            if self._make_changes:
+                paragraph.text = text.replace("  ", ' ')
+                self._docx.invalidate_paragraph(p_i, paragraph)
+                self._log.append(f"Removed double spaces in paragraph {p_i}")
 
-    # TODO _check_size doesnt work correctly
     def _check_size(self):
-        # print(f"In docx {self._docx.get_word_count()} words, {self._docx.get_symbol_count_with_spaces_count()}"
-        #      f" ссп и {self._docx.get_symbol_count_without_spaces_count()} сбп")
-
-        cnt = 0
+        cnt = self._docx.text_statistics.count(self._size_unit)
         if not self._requirements['general']['size_min'] is None:
             if cnt < self._requirements['general']['size_min']:
-                self.errors_list.append(
-                f"Size Min: expected {self._requirements['general']['size_min']}, found {cnt}")
-                self._errors['general']['size_min'].append({"expected": self._requirements['general']['size_min'],
-                                                            "found": cnt
-                                                            })
+                self._errors.add("general.size_min", expected=self._requirements['general']['size_min'], found=cnt)
         if not self._requirements['general']['size_max'] is None:
             if cnt > self._requirements['general']['size_max']:
-                self.errors_list.append(
-                f"Size Max: expected {self._requirements['general']['size_max']}, found {cnt}")
-                self._errors['general']['size_max'].append({"expected": self._requirements['general']['size_max'],
-                                                            "found": cnt
-                                                            })
+                self._errors.add("general.size_max", expected=self._requirements['general']['size_max'], found=cnt)
 
-    def validate_general_requirements(self):
-        """Validate general requirements."""
+    def _general_start(self):
+        self._paragraph_checks = [getattr(self, name) for name in self._plan.paragraph_checks]
+        if self._profiler is not None:
+            self._paragraph_checks = [
+                self._profiler.wrap(name, check, (lambda view: len(view.runs)) if name in _RUN_CHECKS else None)
+                for name, check in zip(self._plan.paragraph_checks, self._paragraph_checks)]
+        self._title_found = False
 
-        title_found = False
-        for i, paragraph in enumerate(self._docx.iter_paragraphs()):
-            # find and skip title
-            if self._title_first_centered and not title_found:
-                if "center" in str(paragraph.paragraph_format.alignment).lower():
-                    title_found = True
-                continue
-            self._check_font(paragraph, i)
-            self._check_interval(paragraph, i)
-            self._check_alignment(paragraph, i)
-            self._check_styles_allowed(paragraph, i)
-            self._check_spaces(paragraph, i)
+    def _general_paragraph(self, view):
+        if not self._paragraph_checks:
+            return
+        # find and skip title
+        if self._title_first_centered and not self._title_found:
+            if "center" in str(view.paragraph_format.alignment).lower():
+                self._title_found = True
+            return
+        for check in self._paragraph_checks:
+            check(view, view.index)
 
+    def _general_finish(self):
         # TODO columns checking
-        title_found = False
-        for i, section in enumerate(self._docx.iter_sections()):
-            if section.start_type == WD_SECTION_START.NEW_COLUMN:
-                if not self._requirements['general']['columns']:
-                    self.errors_list.append(
-                f"Columns: section {i}, expected {self._requirements['general']['columns']}, found True")
-                    self._errors['general']['columns'].append({"section": i,
-                                                               "expected": self._requirements['general']['columns'],
-                                                               "found": True
-                                                               })
-            else:
-                if self._requirements['general']['columns']:
-                    self.errors_list.append(
-                f"Columns: section {i}, expected {self._requirements['general']['columns']}, found False")
-                    self._errors['general']['columns'].append({"section": i,
-                                                               "expected": self._requirements['general']['columns'],
-                                                               "found": False
-                                                               })
-        self._check_size()
+        if self._plan.columns_check:
+            columns = self._requirements['general']['columns']
+            for i, section in enumerate(self._docx.iter_sections()):
+                if section.start_type == WD_SECTION_START.NEW_COLUMN:
+                    if not columns:
+                        self._errors.add("general.columns", i, expected=columns, found=True)
+                else:
+                    if columns:
+                        self._errors.add("general.columns", i, expected=columns, found=False)
+        if self._plan.size_check:
+            self._check_size()
+
+    def validate_general_requirements(self):
+        """Validate general requirements."""
+
+        self._traverse(['_general'])
 
     def _check_images_count(self, images):
         if not self._requirements['images']['num_min'] is None \
                 and not self._requirements['images']['num_max'] is None:
             if self._requirements['images']['num_min'] > self._requirements['images']['num_max']:
-                self.errors_list.append(f"Image Number: Minimal image number {self._requirements['images']['num_min']} "
-                                                    f"is bigger than maximal number "
-                                                    f"{self._requirements['images']['num_max']}")
-                self._errors["requirements"].append(f"Minimal image number {self._requirements['images']['num_min']} "
-                                                    f"is bigger than maximal number "
-                                                    f"{self._requirements['images']['num_max']}")
+                self._errors.add("requirements.images_num", expected=self._requirements['images']['num_min'],
+                                  found=self._requirements['images']['num_max'])
                 return
         if not self._requirements['images']['num_min'] is None:
             if len(images) < self._requirements['images']['num_min']:
-                self.errors_list.append(f"Min Num Images: Min {self._requirements['images']['num_min']}, found {len(images)}")
-                self._errors['images']['num_min'].append({"num_min": self._requirements['images']['num_min'],
-                                                          "found": len(images)
-                                                          })
+                self._errors.add("images.num_min", expected=self._requirements['images']['num_min'], found=len(images))
         if not self._requirements['images']['num_max'] is None:
             if len(images) > self._requirements['images']['num_max']:
-                self.errors_list.append(f"Max Num Images: Max {self._requirements['images']['num_max']}, found {len(images)}")
-                self._errors['images']['num_max'].append({"num_max": self._requirements['images']['num_max'],
-                                                          "found": len(images)
-                                                          })
+                self._errors.add("images.num_max", expected=self._requirements['images']['num_max'], found=len(images))
 
     def _check_image_width(self, image, i=None):
         # Using cm
         if self._requirements['images']['width_max'] is None:
             return
         if image.width.cm > self._requirements['images']['width_max']:
-            self.errors_list.append(f"Images Max Width: image {i}, Max Width {self._requirements['images']['width_max']}, found {image.width.cm}")
-            self._errors['images']['width_max'].append({"image": i,
-                                                        "width_max": self._requirements['images']['width_max'],
-                                                        "found": image.width.cm
-                                                        })
+            self._errors.add("images.width_max", i, expected=self._requirements['images']['width_max'], found=image.width.cm)
             width = image.width.cm
             if self._make_changes:
                 image.width = Cm(self._requirements['images']['width_max'])
                 self._log.append(f"Resized image {i} width from {width} to {image.width.cm}")
 
     def _check_image_dpi(self, image, i=None):
-        if self._requirements['images']["dpi_min"] is None:
+        if self._requirements['images']["dpi_min"] is None or image.dpi is None:
             return
-        if image.info["dpi"][0] < self._requirements['images']["dpi_min"] or \
-                image.info["dpi"][1] < self._requirements['images']["dpi_min"]:
-            self.errors_list.append(f"Images Dpi Width: image {i}, Dpi Min {self._requirements['images']['dpi_min']}, found {image.info['dpi']}")
-            self._errors['images']['dpi_min'].append({"image": i,
-                                                      "dpi_min": self._requirements['images']['dpi_min'],
-                                                      "found": image.info["dpi"]
-                                                      })
+        if image.dpi[0] < self._requirements['images']["dpi_min"] or \
+                image.dpi[1] < self._requirements['images']["dpi_min"]:
+            self._errors.add("images.dpi_min", i, expected=self._requirements['images']['dpi_min'], found=image.dpi)
 
     def _check_image_color(self, images):
         if self._requirements['images']['color_allowed']:
             return
-        ok = True
+        colored = []
         for i, image in enumerate(images):
-            if image.mode not in ["L", "P"]:
-                self.errors_list.append(f"Images Color Allowed: image {i},"
-                                        f" Allowed {self._requirements['images']['color_allowed']}, found True")
-                self._errors['images']['color_allowed'].append({"image": i,
-                                                                "color_allowed": self._requirements['images'][
-                                                                    'color_allowed'],
-                                                                "found": True
-                                                                })
-                ok = False
+            if image.mode is not None and image.mode not in ["L", "LA", "P"]:
+                self._errors.add("images.color_allowed", i, expected=self._requirements['images']['color_allowed'], found=True)
+                colored.append(image.name)
         if self._make_changes:
-            if not ok:
-                self._docx.grayscale_images()
+            if colored:
+                self._docx.grayscale_images(colored)
 
-    def _check_image_link(self, count):
+    def _check_image_link(self):
         if not self._requirements["images"]["links_required"]:
             return
-        for j in range(1, count):
-            for i, paragraph in enumerate(self._docx.iter_paragraphs()):
-                if f"Рисунок {j}" in paragraph.text:
-                    success = False
-                    found_i = 0
-                    for k, paragraph_ in enumerate(self._docx.iter_paragraphs()):
-                        if f"рис. {j}" in paragraph_.text.lower() \
-                                or f"рис {j}" in paragraph_.text.lower() \
-                                or f"рисунок {j}" in paragraph_.text.lower() \
-                                or f"рисунке {j}" in paragraph_.text.lower() \
-                                or f"рисунок {j}" in paragraph_.text.lower() \
-                                or f"рисунка {j}" in paragraph_.text.lower():
-                            if not k == i:
-                                success = True
-                                found_i = k
-                                break
-                    if success:
-                        if i > found_i:
-                            self._warnings["images"]["links"].append(f"Image {j} linked in paragraph {found_i} "
-                                                                     f"before definition in paragraph {i}")
-                    else:
-                        self.errors_list.append(f"Links Required: Image {j} defined in paragraph {i}"
-                                                                        f" haven't linked")
-                        self._errors["images"]["links_required"].append(f"Image {j} defined in paragraph {i}"
-                                                                        f" haven't linked")
+        for j, i, found_i in self._figure_index.links():
+            if found_i is not None:
+                if i > found_i:
+                    self._warnings["images"]["links"].append(f"Image {j} linked in paragraph {found_i} "
+                                                             f"before definition in paragraph {i}")
+            else:
+                self._errors.add("images.links_required", i, found=j)
 
-    def validate_images_requirements(self):
+    def _images_start(self):
+        self._figure_index = CaptionIndex.figures()
+
+    def _images_paragraph(self, view):
+        if self._requirements["images"]["links_required"]:
+            self._figure_index.add(view.index, view.text, view.lower)
+
+    def _images_finish(self):
         image_shapes = self._docx.get_images_shapes()
         self._check_images_count(image_shapes)
         for i, image in enumerate(image_shapes):
             self._check_image_width(image, i)
-        image_files = self._docx.get_images_files()
-        for i, image in enumerate(image_files):
-            self._check_image_dpi(image)
-        self._check_image_color(image_files)
-        self._check_image_link(len(image_shapes))
+        images_info = self._docx.get_images_info()
+        for i, image in enumerate(images_info):
+            self._check_image_dpi(image, i)
+        self._check_image_color(images_info)
+        self._check_image_link()
+
+    def validate_images_requirements(self):
+        self._traverse(['_images'])
 
-    # TODO
     def _check_table_font(self, table, i=None):
-        pass
+        """
+        :param table: tables.TableRecord
+        :param i: table index for logging
+        """
+        expected = self._requirements['tables']['font_size']
+        if expected is None:
+            return
+        changes = 0
+        for size, usage in table.font_sizes.items():
+            if size == expected:
+                continue
+            self._errors.add("tables.font_size", i, usage.cell, expected, size)
+            if self._make_changes and 5 < expected < 50:
+                for r in usage.elements:
+                    r.get_or_add_rPr().sz_val = Pt(expected)
+                changes += len(usage.elements)
+        if changes > 0:
+            self._log.append(f"Change font size {changes} times in table {i} to {expected}")
 
-    # TODO
     def _check_table_alignment(self, table, i=None):
-        if self._requirements['tables']['alignment'] is None:
+        expected = self._requirements['tables']['alignment']
+        if expected is None:
             return
+        value = _ALIGNMENTS.get(expected)
+        changes = 0
+        for alignment, usage in table.alignments.items():
+            if expected.lower() in str(alignment).lower():
+                continue
+            self._errors.add("tables.alignment", i, usage.cell, expected, alignment)
+            if self._make_changes and value is not None:
+                for p in usage.elements:
+                    p.get_or_add_pPr().jc_val = value
+                changes += len(usage.elements)
+        if changes > 0:
+            self._log.append(f"Change alignment {changes} times in table {i} to {expected}")
 
-    # TODO
     def _check_table_width(self, table, i=None):
-        pass
+        # Using cm
+        width_max = self._requirements['tables']['width_max']
+        if width_max is None or table.width is None:
+            return
+        if table.width.cm > width_max:
+            self._errors.add("tables.width_max", i, expected=width_max, found=table.width.cm)
 
-    # TODO
-    def _check_table_link(self, table, i=None):
-        pass
+    def _check_table_link(self):
+        if not self._requirements['tables']['links_required']:
+            return
+        for j, i, found_i in self._table_index.links():
+            if found_i is not None:
+                if i > found_i:
+                    self._warnings["tables"]["links"].append(f"Table {j} linked in paragraph {found_i} "
+                                                             f"before definition in paragraph {i}")
+            else:
+                self._errors.add("tables.links_required", i, found=j)
+
+    def _tables_start(self):
+        self._table_index = CaptionIndex.tables()
+
+    def _tables_paragraph(self, view):
+        if self._requirements['tables']['links_required']:
+            self._table_index.add(view.index, view.text, view.lower)
+
+    def _tables_finish(self):
+        tables = self._requirements['tables']
+        if tables['font_size'] is not None or tables['alignment'] is not None or tables['width_max'] is not None:
+            style_table = self._docx.style_table
+            for i, tbl in enumerate(self._docx.get_tables()):
+                table = TableRecord(tbl, style_table, self._make_changes)
+                self._check_table_font(table, i)
+                self._check_table_alignment(table, i)
+                self._check_table_width(table, i)
+        self._check_table_link()
 
-    # TODO
     def validate_tables_requirements(self):
-        tables = self._docx.get_tables()
-        for i, table in enumerate(tables):
-            self._check_table_font(table)
+        self._traverse(['_tables'])
 
     def _check_keywords_num(self, keywords):
         if self._requirements["keywords"]["num_min"] is None \
@@ -463,89 +799,54 @@ class DesignValidator(object):
         if not self._requirements["keywords"]["num_min"] is None \
                 and not self._requirements["keywords"]["num_max"] is None \
                 and self._requirements["keywords"]["num_min"] > self._requirements["keywords"]["num_max"]:
-            self._errors["requirements"].append(f"Minimal keywords number {self._requirements['keywords']['num_min']} "
-                                                f"is bigger than maximal number "
-                                                f"{self._requirements['keywords']['num_max']}")
+            self._errors.add("requirements.keywords_num", expected=self._requirements["keywords"]["num_min"],
+                              found=self._requirements["keywords"]["num_max"])
             return
         cnt = len(keywords)
         if self._requirements["keywords"]["english"] == "duplicate":
             cnt /= 2.0
         if not self._requirements['keywords']['num_min'] is None:
             if cnt < self._requirements['keywords']['num_min']:
-                self.errors_list.append(f"Keyword Min Num: Min Num {self._requirements['keywords']['num_min']}, found {cnt}")
-                self._errors['keywords']['num_min'].append({"num_min": self._requirements['keywords']['num_min'],
-                                                            "found": cnt
-                                                            })
+                self._errors.add("keywords.num_min", expected=self._requirements['keywords']['num_min'], found=cnt)
         if not self._requirements['keywords']['num_max'] is None:
             if cnt > self._requirements['keywords']['num_max']:
-                self.errors_list.append(f"Keyword Max Num: Max Num {self._requirements['keywords']['num_max']}, found {cnt}")
-                self._errors['keywords']['num_max'].append({"num_max": self._requirements['keywords']['num_max'],
-                                                            "found": cnt
-                                                            })
+                self._errors.add("keywords.num_max", expected=self._requirements['keywords']['num_max'], found=cnt)
 
     def _check_keywords_lang(self, keywords):
-        if self._requirements["keywords"]["english"] == "only":
-            for i, w in enumerate(keywords):
-                lang = detect(w.encode('cp1251'))["language"]
-                if lang == "Russian":
-                    self.errors_list.append(f"Keyword English: English {self._requirements['keywords']['english']}, word {w}")
-                    self._errors["keywords"]["english"].append({
-                        "english": self._requirements["keywords"]["english"],
-                        "found": w
-                    })
+        english = self._requirements["keywords"]["english"]
+        if english not in ("only", "no", "duplicate"):
+            return
+        # words with any Cyrillic letter count as Russian
+        labels = classify_words(keywords)
+        if english == "only":
+            for w, label in zip(keywords, labels):
+                if label is not None and label != LATIN:
+                    self._errors.add("keywords.english", expected=self._requirements["keywords"]["english"], found=w)
                     break
-        elif self._requirements["keywords"]["english"] == "no":
-            for i, w in enumerate(keywords):
-                if not re.match(r"[A-Za-z]+", w) is None:
-                    self.errors_list.append(f"Keyword English: English {self._requirements['keywords']['english']}, word {w}")
-                    self._errors["keywords"]["english"].append({
-                        "english": self._requirements["keywords"]["english"],
-                        "found": w
-                    })
+        elif english == "no":
+            for w, label in zip(keywords, labels):
+                if label is not None and label != CYRILLIC:
+                    self._errors.add("keywords.english", expected=self._requirements["keywords"]["english"], found=w)
                     break
-        elif self._requirements["keywords"]["english"] == "duplicate":
-            eng_num = 0
-            rus_num = 0
-            for i, w in enumerate(keywords):
-                lang = detect(w.encode('cp1251'))["language"]
-                # print(w, lang)
-                if lang == "Russian":
-                    rus_num += 1
-                else:
-                    eng_num += 1
+        elif english == "duplicate":
+            rus_num = sum(1 for label in labels if label is not None and label != LATIN)
+            eng_num = len(labels) - rus_num
             if not eng_num == rus_num:
-                self.errors_list.append(f"Keyword English: English {self._requirements['keywords']['english']}, eng_num {eng_num}, rus_num {rus_num}")
-                self._errors["keywords"]["english"].append({
-                    "english": self._requirements["keywords"]["english"],
-                    "eng_num": eng_num,
-                    "rus_num": rus_num
-                })
+                self._errors.add("keywords.english_num", expected=self._requirements["keywords"]["english"],
+                                  found=(eng_num, rus_num))
+
+    @property
+    def front_matter(self):
+        """FrontMatter of the document, read on first use."""
+        if self._front_matter is None:
+            self._front_matter = FrontMatter.scan(self._docx.iter_paragraphs(), self._front_matter_limit)
+        return self._front_matter
 
     def validate_keywords(self):
-        words = []
-        k = 0
-        for i, paragraph in enumerate(self._docx.iter_paragraphs()):
-            if "ключевые слова" in paragraph.text.lower() \
-                    or "keywords" in paragraph.text.lower():
-                if k >= 2:
-                    break
-                k += 1
-                i = paragraph.text.lower().find("слова")
-                if i == -1:
-                    i = paragraph.text.lower().find("keywords")
-                    i += 9
-                else:
-                    i += 5
-                words.extend(list(filter(lambda x: not x == "",
-                                         [re.sub(r'[^A-Za-zА-Яа-я]+', '', s) for s
-                                          in re.split(r'[,;]', paragraph.text.lower()[i:])])))
-        # print(words)
+        words = self.front_matter.keyword_list
         if len(words) == 0:
             if self._requirements["keywords"]["required"]:
-                self.errors_list.append(f"Keyword Required: Required {self._requirements['keywords']['required']}, found False")
-                self._errors["keywords"]["required"].append({"required": self._requirements['keywords']['required'],
-                                                             "found": False
-                                                             })
+                self._errors.add("keywords.required", expected=self._requirements['keywords']['required'], found=False)
                 return
         self._check_keywords_num(words)
         self._check_keywords_lang(words)
@@ -553,68 +854,267 @@ class DesignValidator(object):
     def validate_udc(self):
         if not self._requirements["UDC"]["required"]:
             return
-        found_udc = False
-        see_next = False
-        i = 0
-        for j, paragraph in enumerate(self._docx.iter_paragraphs()):
-            if "УДК" in paragraph.text:
-                # print(1)
-                i = paragraph.text.find(" ", paragraph.text.find("УДК"))
-                if i is None:
-                    see_next = True
-            elif see_next:
-                # print(2)
-                i = 0
-                """
-                i = paragraph.text.find(" ")
-                if i is None:
-                    see_next = False
-                """
-            else:
-                # print(3)
-                i = 0
-            if ("УДК" in paragraph.text or see_next) and i is not None:
-                # print(f"i = {i}")
-                # print(paragraph.text[i:])
-                udc = re.findall(r'[0-9]+[0-9.+*:/\\\[\]]*[A-Z]*', paragraph.text[i:])
-                # print(udc)
-                if len(udc) == 1:
-                    found_udc = True
-                    self._log.append(f"Found UDC {udc[0]} in paragraph {j}")
-                elif len(udc) > 0:
-                    self._log.append(f"Found multiple matches for UDC: {udc} in paragraph {j}")
-                elif not see_next:
-                    see_next = True
-                elif see_next:
-                    see_next = False
-            if found_udc:
-                break
-        if not found_udc:
-            self.errors_list.append(f"UDC: not found but required")
-            self._errors["UDC"].append("UDC not found but required")
+        front_matter = self.front_matter
+        if front_matter.udc_candidates:
+            self._log.append(f"Found multiple matches for UDC: {front_matter.udc_candidates} "
+                             f"in paragraph {front_matter.udc_candidates_paragraph}")
+        if front_matter.udc is not None:
+            self._log.append(f"Found UDC {front_matter.udc} in paragraph {front_matter.udc_paragraph}")
+        else:
+            self._errors.add("UDC")
+
+    @staticmethod
+    def _part(value):
+        # parts are given as fractions or as percents
+        return value / 100.0 if value > 1 else value
+
+    def _check_literature_num(self, bibliography):
+        literature = self._requirements['literature']
+        if literature['num_min'] is not None and len(bibliography) < literature['num_min']:
+            self._errors.add("literature.num_min", expected=literature['num_min'], found=len(bibliography))
+        if literature['num_max'] is not None and len(bibliography) > literature['num_max']:
+            self._errors.add("literature.num_max", expected=literature['num_max'], found=len(bibliography))
+
+    def _check_literature_doi(self, bibliography):
+        if not self._requirements['literature']['DOI_required']:
+            return
+        for j, entry in enumerate(bibliography.entries):
+            if entry.doi is None:
+                self._errors.add("literature.DOI_required", entry.paragraph, j + 1, True, False)
+
+    def _check_literature_parts(self, bibliography):
+        literature = self._requirements['literature']
+        num = len(bibliography)
+        if num == 0:
+            return
+        if literature['self-citation_part'] is not None:
+            part = bibliography.count_self_citations(self.front_matter.authors) / num
+            if part > self._part(literature['self-citation_part']):
+                self._errors.add("literature.self_citation_part", expected=literature['self-citation_part'],
+                                 found=part)
+        foreign = bibliography.count_foreign() / num
+        if literature['foreign_part_min'] is not None and foreign < self._part(literature['foreign_part_min']):
+            self._errors.add("literature.foreign_part_min", expected=literature['foreign_part_min'], found=foreign)
+        if literature['foreign_part_max'] is not None and foreign > self._part(literature['foreign_part_max']):
+            self._errors.add("literature.foreign_part_max", expected=literature['foreign_part_max'], found=foreign)
+
+    def _check_literature_years(self, bibliography):
+        """novelty_settings: [year, min number, min part] of references
+        since year, antiquity_settings: [year, max number, max part] of
+        references before year."""
+        literature = self._requirements['literature']
+        num = len(bibliography)
+        if num == 0:
+            return
+        novelty = literature['novelty_settings']
+        if novelty and novelty[0] is not None:
+            count = bibliography.count_since(novelty[0])
+            num_min = novelty[1] if len(novelty) > 1 else None
+            part_min = novelty[2] if len(novelty) > 2 else None
+            if num_min is not None and count < num_min \
+                    or part_min is not None and count / num < self._part(part_min):
+                self._errors.add("literature.novelty_settings", expected=novelty, found=(count, count / num))
+        antiquity = literature['antiquity_settings']
+        if antiquity and antiquity[0] is not None:
+            count = bibliography.count_before(antiquity[0])
+            num_max = antiquity[1] if len(antiquity) > 1 else None
+            part_max = antiquity[2] if len(antiquity) > 2 else None
+            if num_max is not None and count > num_max \
+                    or part_max is not None and count / num > self._part(part_max):
+                self._errors.add("literature.antiquity_settings", expected=antiquity, found=(count, count / num))
+
+    def _literature_start(self):
+        self._literature_sections = SectionIndex()
+        self._literature_paragraphs = []
+
+    def _literature_paragraph(self, view):
+        sections = self._literature_sections
+        text = view.text
+        literature = sections.by_name.get('literature')
+        if literature and sections.sections[-1] is not literature[0]:
+            # only the first reference list, the next one is usually its transliteration
+            return
+        sections.add(view.index, text, view)
+        literature = sections.by_name.get('literature')
+        # any section after the first reference list, a second one too, ends it
+        if literature and sections.sections[-1] is literature[0] and view.index >= literature[0].start:
+            self._literature_paragraphs.append((view.index, text))
+
+    def _literature_finish(self):
+        self.bibliography = Bibliography.from_paragraphs(self._literature_paragraphs)
+        if len(self.bibliography) > 0:
+            self._log.append(f"Found {len(self.bibliography)} references in paragraphs "
+                             f"{self.bibliography.entries[0].paragraph}–{self.bibliography.entries[-1].paragraph}")
+        self._check_literature_num(self.bibliography)
+        self._check_literature_doi(self.bibliography)
+        self._check_literature_parts(self.bibliography)
+        self._check_literature_years(self.bibliography)
 
     def validate_literature(self):
-        pass
+        self._traverse(['_literature'])
 
-    def result(self):
-        if self._make_changes:
-            grayscale_image_num = self._docx.save_as("out/_result.docx")
-            self._log.append(
-                f"Grayscale succeed on {grayscale_image_num} images from {len(self._docx.get_images_shapes())}")
-        return self._errors, self._log, self._warnings, self.errors_list
+    def save(self, destination=None):
+        """Write the fixed document.
+
+        :param destination: path or binary file-like object, None implies
+                            returning the document as bytes
+        :return: bytes if destination is None
+        """
+        output = io.BytesIO() if destination is None else destination
+        if self._profiler is None:
+            grayscale_image_num = self._docx.save_as(output)
+        else:
+            grayscale_image_num = self._profiler.measure("save_as", self._docx.save_as, output)
+        self._log.append(
+            f"Grayscale succeed on {grayscale_image_num} images from {len(self._docx.get_images_shapes())}")
+        if destination is None:
+            return output.getvalue()
+
+    def result(self, aggregate=False, profile=False, destination=RESULT_PATH):
+        """
+        :param aggregate: merge errors of one check with the same expected
+                          and found values, locations become ranges
+        :param profile: also return the profile of a validator created
+                        with profiling enabled
+        :param destination: path or binary file-like object the fixed
+                            document is saved to if make_changes is set,
+                            None skips saving, e.g. to call save() later
+        :return: errors json, log, warnings, error messages[, profile]
+        """
+        if self._make_changes and destination is not None:
+            self.save(destination)
+        if profile:
+            return self._errors.to_json(aggregate), self._log, self._warnings, self._errors.messages(aggregate), \
+                self.profile
+        return self._errors.to_json(aggregate), self._log, self._warnings, self._errors.messages(aggregate)
+
+    def _traverse(self, checks):
+        """Run paragraph-level checks in one pass over the document.
+
+        :param checks: prefixes of _<check>_start, _<check>_paragraph and
+                       _<check>_finish methods, e.g. ['_keywords', '_udc']
+        """
+        collect_statistics = '_general' in checks and self._plan.size_check \
+            and not self._docx.has_text_statistics
+        statistics = TextStatistics() if collect_statistics else None
+        profiler = self._profiler
+        for check in checks:
+            if profiler is None:
+                getattr(self, check + '_start')()
+            else:
+                profiler.measure(_PHASE_NAMES[check], getattr(self, check + '_start'), calls=0)
+        steps = [getattr(self, check + '_paragraph') for check in checks]
+        if profiler is not None:
+            steps = [profiler.wrap(_PHASE_NAMES[check], step) for check, step in zip(checks, steps)]
+        for i, paragraph in enumerate(self._docx.iter_paragraphs()):
+            view = ParagraphView(i, paragraph)
+            for step in steps:
+                step(view)
+            if collect_statistics:
+                statistics.append(view.text)
+        if collect_statistics:
+            self._docx.text_statistics = statistics
+        for check in checks:
+            if profiler is None:
+                getattr(self, check + '_finish')()
+            else:
+                profiler.measure(_PHASE_NAMES[check], getattr(self, check + '_finish'), calls=0)
 
     def validate(self):
-        self.validate_general_requirements()
-        self.validate_images_requirements()
-        self.validate_tables_requirements()
-        self.validate_keywords()
-        self.validate_udc()
+        """Run all enabled checks, paragraph-level ones in a single pass."""
 
+        fused = [_PARAGRAPH_PHASES[phase] for phase in self._plan.phases
+                 if phase in _PARAGRAPH_PHASES]
+        if fused:
+            self._traverse(fused)
+        for phase in self._plan.phases:
+            if phase not in _PARAGRAPH_PHASES:
+                if self._profiler is None:
+                    getattr(self, phase)()
+                else:
+                    self._profiler.measure(phase, getattr(self, phase))
 
-class StructureValidator:
 
-    def __init__(self):
-        pass
+class StructureValidator(object):
+    """Class for validating presence and size of document sections.
+
+    Sections are found in a single pass over the paragraphs, then every
+    check is a lookup in the SectionIndex.
+    """
+
+    def __init__(self, wrapper, requirements):
+        """
+        :param wrapper: Wrapper
+        :param requirements: json or RequirementsPlan compiled from it
+        """
+        if not isinstance(requirements, RequirementsPlan):
+            requirements = RequirementsPlan(requirements)
+        self._requirements = requirements.requirements
+        # one of TextStatistics.kinds, used for size_min and size_max
+        self._size_unit = "words"
+        self._docx = wrapper
+        self._log = []
+        self._errors = ErrorStore(_STRUCTURE_ERROR_FORMATS, _STRUCTURE_ERRORS_SKELETON)
+        self._warnings = {
+            "sections": {
+                "duplicates": []
+            }
+        }
+        self.sections = None
+
+    @property
+    def errors_list(self):
+        return self._errors.messages()
+
+    def _index(self):
+        """Find sections and count paragraph sizes in one traversal."""
+        sections = SectionIndex()
+        # sizes are only needed by size_min and size_max checks
+        collect_statistics = not self._docx.has_text_statistics and any(
+            requirements.get('size_min') is not None or requirements.get('size_max') is not None
+            for requirements in (self._requirements.get(name) for name in _STRUCTURE_SECTIONS)
+            if requirements is not None)
+        statistics = TextStatistics() if collect_statistics else None
+        for i, paragraph in enumerate(self._docx.iter_paragraphs()):
+            text = paragraph.text
+            sections.add(i, text, paragraph)
+            if collect_statistics:
+                statistics.append(text)
+        sections.finish()
+        if collect_statistics:
+            self._docx.text_statistics = statistics
+        return sections
+
+    def _check_section(self, name, requirements):
+        found = self.sections.by_name.get(name, [])
+        if len(found) > 1:
+            self._warnings["sections"]["duplicates"].append(
+                f"Section {name} found {len(found)} times, in paragraphs {[s.heading for s in found]}")
+        if not found:
+            if requirements['required']:
+                self._errors.add(name + ".required", expected=True, found=False)
+            return
+        self._log.append(f"Found section {name} in paragraph {found[0].heading}")
+        if requirements.get('size_min') is None and requirements.get('size_max') is None:
+            return
+        size = self.sections.size(name, self._docx.text_statistics, self._size_unit)
+        if requirements['size_min'] is not None and size < requirements['size_min']:
+            self._errors.add(name + ".size_min", found[0].heading, expected=requirements['size_min'], found=size)
+        if requirements['size_max'] is not None and size > requirements['size_max']:
+            self._errors.add(name + ".size_max", found[0].heading, expected=requirements['size_max'], found=size)
+
+    def validate(self):
+        self.sections = self._index()
+        for name in _STRUCTURE_SECTIONS:
+            requirements = self._requirements.get(name)
+            if requirements is not None:
+                self._check_section(name, requirements)
+
+    def result(self, aggregate=False):
+        """
+        :return: errors json, log, warnings, error messages
+        """
+        return self._errors.to_json(aggregate), self._log, self._warnings, self._errors.messages(aggregate)
 
 
 class ContentValidator:
@@ -6,23 +6,77 @@ __all__ = ['DocumentWrapper']
 
 import io
 import os
-import re
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image, ImageOps
 from PIL.PngImagePlugin import PngInfo
 from docx import Document
 
 from docx.enum.shape import WD_INLINE_SHAPE
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+
+from imageinfo import iter_media_info
+from package import write_package
+from styles import RunSignature, StyleTable
+from textstats import TextStatistics
 
 
 class DocumentWrapper(object):
     """Wrapper class for retrieving docx document attributes."""
 
-    def __init__(self, filename):
-        self._grayscale_images = False
-        self._filename = filename
-        self._document = Document(filename)
+    # fixes applied to paragraphs, runs and tables are saved by save_as
+    read_only = False
+
+    def __init__(self, source, image_workers=None):
+        """
+        :param source: docx file path, bytes or binary file-like object
+        :param image_workers: size of the thread pool converting images on
+                              save, None implies ThreadPoolExecutor default
+        """
+
+        self._grayscale_images = set()
+        self._image_workers = image_workers
+        self._source = self._read_source(source)
+        self._document = Document(self._package_source())
+        self._style_table = None
+        self._text_statistics = None
+        self._signatures = {}
+
+    @staticmethod
+    def _read_source(source):
+        """Get path or bytes of a docx given as path, bytes or file-like object."""
+
+        if isinstance(source, (str, os.PathLike)):
+            return os.fspath(source)
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return bytes(source)
+        # file-like objects may be unseekable or closed by the caller later
+        return source.read()
+
+    def _package_source(self):
+        """Get path or a new file-like object of the source package.
+
+        Every caller gets its own stream, so the package can be read from
+        several threads.
+        """
+
+        if isinstance(self._source, bytes):
+            return io.BytesIO(self._source)
+        return self._source
+
+    def _open_package(self):
+        return zipfile.ZipFile(self._package_source())
+
+    @property
+    def style_table(self):
+        """Effective formatting of all document styles, built on first use."""
+
+        if self._style_table is None:
+            with self._open_package() as archive:
+                self._style_table = StyleTable.from_archive(archive)
+        return self._style_table
 
     def iter_paragraphs(self, styles=None):
         """Get paragraphs of specific styles of a document.
@@ -32,7 +86,10 @@ class DocumentWrapper(object):
         :type styles: list
         """
 
-        for paragraph in self._document.paragraphs:
+        # lazy, so readers of the first paragraphs do not wrap the rest
+        for paragraph in self._document.iter_inner_content():
+            if not isinstance(paragraph, Paragraph):
+                continue
             if styles:
                 if paragraph.style.name in styles:
                     yield paragraph
@@ -71,31 +128,95 @@ class DocumentWrapper(object):
         return fetched_attributes
 
     def find_paragraph_attribute(self, p_style, p_element, attr):
-        value = p_style.__getattribute__(p_element).__getattribute__(attr)
-        if value is None and p_style.base_style is not None:
-            return self.find_paragraph_attribute(p_style.base_style,
-                                                 p_element, attr)
-        return value
+        """Get style attribute resolved through basedOn chain,
+        w:docDefaults and theme fonts.
+
+        :param p_style: paragraph style, None implies document defaults
+        :param p_element: 'font' or 'paragraph_format'
+        :param attr: attribute name, e.g. 'size' or 'alignment'
+        """
+
+        if not StyleTable.tracks(p_element, attr):
+            # e.g. keep_with_next, only the style objects know it
+            while p_style is not None:
+                value = getattr(getattr(p_style, p_element), attr, None)
+                if value is not None:
+                    return value
+                p_style = p_style.base_style
+            return None
+        return self.style_table.get(getattr(p_style, 'style_id', None),
+                                    p_element, attr)
+
+    @property
+    def text_statistics(self):
+        """Per-paragraph word and symbol counts, computed on first use."""
+
+        if self._text_statistics is None:
+            self._text_statistics = TextStatistics(
+                paragraph.text for paragraph in self.iter_paragraphs())
+        return self._text_statistics
+
+    @text_statistics.setter
+    def text_statistics(self, statistics):
+        """Use statistics collected by a caller that already iterated
+        all paragraphs."""
+
+        self._text_statistics = statistics
+
+    @property
+    def has_text_statistics(self):
+        return self._text_statistics is not None
+
+    def invalidate_paragraph(self, i, paragraph):
+        """Recount statistics of paragraph i after its text was fixed."""
+
+        if self._text_statistics is not None:
+            self._text_statistics.update(i, paragraph.text)
+
+    def paragraph_style_id(self, paragraph):
+        """Get id of the effective paragraph style from the raw w:pStyle.
+
+        Same style as paragraph.style resolves to, without the python-docx
+        styles part lookup. None if the document has no styles.
+        """
+
+        style = self.style_table.styles.get(paragraph._p.style)
+        if style is None or style.type != 'paragraph':
+            style = self.style_table.default_style
+        return getattr(style, 'style_id', None)
+
+    def run_signatures(self, paragraph, runs=None):
+        """Get interned formatting signatures of paragraph runs.
+
+        Runs with the same style, font and direct formatting share one
+        RunSignature object, resolved through the style table only once.
+
+        :param runs: paragraph.runs if they are already fetched
+        """
+
+        style_id = self.paragraph_style_id(paragraph)
+        signatures = []
+        for run in runs if runs is not None else paragraph.runs:
+            font = run.font
+            key = (style_id, font.name, font.size, run.bold, run.italic, run.underline)
+            signature = self._signatures.get(key)
+            if signature is None:
+                name = font.name or self.style_table.get(style_id, 'font', 'name')
+                size = font.size or self.style_table.get(style_id, 'font', 'size')
+                signature = RunSignature(style_id, name, getattr(size, 'pt', None),
+                                         run.bold, run.italic, run.underline)
+                self._signatures[key] = signature
+            signatures.append(signature)
+        return signatures
 
-    def get_word_count(self):
-        cnt = 0
-        for i, paragraph in enumerate(self.iter_paragraphs()):
-            cnt += len(re.findall(r'\w+', paragraph.text))
-        return cnt
-
-    def get_symbol_count_with_spaces_count(self):
-        cnt = 0
-        for i, paragraph in enumerate(self.iter_paragraphs()):
-            cnt += len(paragraph.text) - len(re.findall(r'\n', paragraph.text))
-        return cnt
-
-    def get_symbol_count_without_spaces_count(self):
-        cnt = 0
-        for i, paragraph in enumerate(self.iter_paragraphs()):
-            cnt += len(paragraph.text) - len(re.findall(r' ', paragraph.text)) \
-                   - len(re.findall(r'\t', paragraph.text)) \
-                   - len(re.findall(r'\n', paragraph.text))
-        return cnt
+    def get_word_count(self, start=0, end=None):
+        return self.text_statistics.count('words', start, end)
+
+    def get_symbol_count_with_spaces_count(self, start=0, end=None):
+        return self.text_statistics.count('symbols_with_spaces', start, end)
+
+    def get_symbol_count_without_spaces_count(self, start=0, end=None):
+        return self.text_statistics.count('symbols_without_spaces', start, end)
 
     def get_images_shapes(self):
         images = []
@@ -106,66 +227,113 @@ class DocumentWrapper(object):
         return images
 
     def get_images_files(self):
-        images = []
-        archive = zipfile.ZipFile(self._filename)
-        for file in archive.filelist:
-            if file.filename.startswith('word/media/image'):
-                image = Image.open(str(archive.extract(file)))
-                images.append(image)
-                '''        
-            for rel in self._document.part.rels.values():
-            if "image" in rel.reltype:
-                image = Image.open(f"{self._filename}{rel.target_part.partname}")
-                images.append(image)
-                '''
+        """Open media images with PIL lazily, without extracting to disk."""
 
+        images = []
+        with self._open_package() as archive:
+            for file in archive.filelist:
+                if file.filename.startswith('word/media/image'):
+                    images.append(Image.open(io.BytesIO(archive.read(file))))
         return images
 
-    def grayscale_images(self):
+    def get_images_info(self):
+        """Get format, size, mode and dpi of all media images.
+
+        Only file headers are read, straight from the docx archive.
+
+        :rtype: list of imageinfo.ImageInfo
         """
-        image_files = self.get_images_files()
-        if i < 0 or i > len(image_files):
-            return False
-        k = 0
-        for rel in self._document.part.rels.values():
-            if "image" in rel.reltype:
-                if k == i:
-                    rel.target_part.blob = (ImageOps.grayscale(image_files[i])).tobytes()
-                    return True
-                else:
-                    k += 1
+
+        with self._open_package() as archive:
+            return list(iter_media_info(archive))
+
+    def grayscale_images(self, names=None):
+        """Mark media images to be converted to grayscale on save.
+
+        :param names: archive names of images, e.g. ImageInfo.name of the
+                      images found colored. None implies all media images
         """
-        # print(os.access(self._filename, os.W_OK))
-        self._grayscale_images = True
 
+        if names is None:
+            with self._open_package() as archive:
+                names = [name for name in archive.namelist()
+                         if name.startswith('word/media/image')]
+        self._grayscale_images.update(names)
 
     def get_tables(self):
-        return self._document.tables
+        """Iterate over top-level w:tbl elements, see tables.TableRecord."""
+
+        return self._document.element.body.iterchildren(qn('w:tbl'))
+
+    @staticmethod
+    def _grayscale_image(data):
+        """Convert image file content to grayscale in its own format.
+
+        Returns None for images PIL cannot write back, they stay unchanged.
+        """
 
-    def save_as(self, filepath):
-        self._document.save(filepath)
+        image = Image.open(io.BytesIO(data))
+        image_format = image.format
+        if image.mode in ('L', 'LA'):
+            return None
+        if image_format == 'JPEG':
+            # let libjpeg decode straight to grayscale
+            image.draft('L', image.size)
+        # images without a resolution stay without it
+        options = {'dpi': image.info['dpi']} if 'dpi' in image.info else {}
+        try:
+            bs = io.BytesIO()
+            ImageOps.grayscale(image).save(bs, format=image_format, **options)
+        except (KeyError, OSError, ValueError):
+            return None
+        return bs.getvalue()
+
+    def save_as(self, destination):
+        """Save document, converting marked images to grayscale.
+
+        Marked images are converted in a thread pool, then the package is
+        written in one pass: the main document part is serialized, grayscale
+        images are substituted and every other member is copied raw from
+        the source file.
+
+        :param destination: path or binary file-like object
+        :return: number of converted images
+        """
+
+        source = self._package_source()
+        with zipfile.ZipFile(source) as archive:
+            names = archive.namelist()
+        part_names = {part.partname.lstrip('/')
+                      for part in self._document.part.package.iter_parts()}
+        # fixes only edit the main document part, other XML parts are
+        # copied raw instead of being serialized again
+        main_part = self._document.part
+        parts = {main_part.partname.lstrip('/'): main_part.blob}
+        if not part_names.issubset(names):
+            # python-docx added parts, so content types and relationships
+            # have to be written by python-docx itself
+            source = io.BytesIO()
+            self._document.save(source)
+            parts = {}
         if self._grayscale_images:
-            archive = zipfile.ZipFile(filepath, "a")
-            done = []
-            num = 0
-            infolist = archive.infolist()
-            for entry in infolist:
-                if entry.filename.startswith(f'word/media/image') and entry.filename not in done:
-                    file = archive.open(entry, "r")
-                    image = Image.open(file)
-                    image = ImageOps.grayscale(image)
-                    bs = io.BytesIO()
-                    image.save(bs, format=entry.filename.split(".")[-1])
-                    bs = bs.getvalue()
-                    file.close()
-                    file = archive.open(entry, "w")
-                    file.write(bs)
-                    file.close()
-                    done.append(entry.filename)
-                    num += 1
-            archive.close()
-            return num
+            media = [name for name in names if name in self._grayscale_images]
+            with zipfile.ZipFile(source) as archive:
+                blobs = [archive.read(name) for name in media]
+            # PIL releases the GIL while decoding and encoding
+            with ThreadPoolExecutor(self._image_workers) as pool:
+                for name, blob in zip(media, pool.map(self._grayscale_image, blobs)):
+                    if blob is not None:
+                        parts[name] = blob
+        replaced = write_package(source, destination, parts)
+        return len([name for name in replaced
+                    if name.startswith('word/media/image')])
+
+    def to_bytes(self):
+        """Get the saved document as bytes, see save_as."""
 
+        output = io.BytesIO()
+        self.save_as(output)
+        return output.getvalue()
 
     @staticmethod
     def _convert_unit(value, unit):